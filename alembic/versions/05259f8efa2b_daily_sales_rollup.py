@@ -0,0 +1,42 @@
+"""daily sales rollup
+
+Revision ID: 05259f8efa2b
+Revises: e745c404eb43
+Create Date: 2026-10-18 09:12:41.208311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '05259f8efa2b'
+down_revision: Union[str, None] = 'e745c404eb43'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('daily_sales_rollup',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('orders_count', sa.Integer(), nullable=False),
+    sa.Column('gross', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('cancelled_count', sa.Integer(), nullable=False),
+    sa.Column('cancelled_amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+    # Backfill from existing orders; app.utils.rollup keeps it current from here
+    op.execute(
+        "INSERT INTO daily_sales_rollup "
+        "(day, orders_count, gross, cancelled_count, cancelled_amount) "
+        "SELECT date(created_at), count(*), coalesce(sum(total_amount), 0), "
+        "sum(CASE WHEN status = 'cancelled' THEN 1 ELSE 0 END), "
+        "coalesce(sum(CASE WHEN status = 'cancelled' THEN total_amount ELSE 0 END), 0) "
+        "FROM orders GROUP BY date(created_at)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('daily_sales_rollup')
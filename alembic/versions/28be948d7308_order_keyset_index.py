@@ -0,0 +1,25 @@
+"""order keyset index
+
+Revision ID: 28be948d7308
+Revises: 2bd8af331379
+Create Date: 2026-10-18 11:40:06.913245
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '28be948d7308'
+down_revision: Union[str, None] = '2bd8af331379'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_orders_created_at_id', 'orders', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_orders_created_at_id', table_name='orders')
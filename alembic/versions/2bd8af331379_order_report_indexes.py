@@ -0,0 +1,34 @@
+"""order and report indexes
+
+Revision ID: 2bd8af331379
+Revises: 05259f8efa2b
+Create Date: 2026-10-18 10:03:17.552904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2bd8af331379'
+down_revision: Union[str, None] = '05259f8efa2b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_orders_status_created_at', 'orders', ['status', 'created_at'], unique=False)
+    op.create_index(op.f('ix_orders_user_id'), 'orders', ['user_id'], unique=False)
+    op.create_index(op.f('ix_order_items_order_id'), 'order_items', ['order_id'], unique=False)
+    op.create_index(op.f('ix_order_items_item_id'), 'order_items', ['item_id'], unique=False)
+    # Fails if an item already has more than one inventory row; merge those first
+    op.create_index(op.f('ix_inventory_item_id'), 'inventory', ['item_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_inventory_item_id'), table_name='inventory')
+    op.drop_index(op.f('ix_order_items_item_id'), table_name='order_items')
+    op.drop_index(op.f('ix_order_items_order_id'), table_name='order_items')
+    op.drop_index(op.f('ix_orders_user_id'), table_name='orders')
+    op.drop_index('ix_orders_status_created_at', table_name='orders')
@@ -0,0 +1,28 @@
+"""order client key
+
+Revision ID: 3b6202b51892
+Revises: 28be948d7308
+Create Date: 2026-10-18 13:21:54.370118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b6202b51892'
+down_revision: Union[str, None] = '28be948d7308'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('orders', sa.Column('client_key', sa.String(), nullable=True))
+    op.create_index(op.f('ix_orders_client_key'), 'orders', ['client_key'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_orders_client_key'), table_name='orders')
+    op.drop_column('orders', 'client_key')
@@ -0,0 +1,47 @@
+"""order status events
+
+Revision ID: 4a1c9e7b2d3f
+Revises: 36d4321ac43c
+Create Date: 2026-10-18 15:11:42.318905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a1c9e7b2d3f'
+down_revision: Union[str, None] = '36d4321ac43c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('order_status_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('changed_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['changed_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_order_status_events_id'), 'order_status_events', ['id'], unique=False)
+    op.create_index(op.f('ix_order_status_events_created_at'), 'order_status_events', ['created_at'], unique=False)
+    op.create_index('ix_order_status_events_order_id_created_at', 'order_status_events', ['order_id', 'created_at'], unique=False)
+
+    # Existing orders start their history at the status they are in now
+    op.execute(
+        "INSERT INTO order_status_events (order_id, status, created_at) "
+        "SELECT id, status, created_at FROM orders"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_order_status_events_order_id_created_at', table_name='order_status_events')
+    op.drop_index(op.f('ix_order_status_events_created_at'), table_name='order_status_events')
+    op.drop_index(op.f('ix_order_status_events_id'), table_name='order_status_events')
+    op.drop_table('order_status_events')
@@ -0,0 +1,44 @@
+"""item daily sales
+
+Revision ID: 9c2e5d71a4b8
+Revises: 4a1c9e7b2d3f
+Create Date: 2026-10-18 16:04:19.552173
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c2e5d71a4b8'
+down_revision: Union[str, None] = '4a1c9e7b2d3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('item_daily_sales',
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('qty', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['item_id'], ['items.id'], ),
+    sa.PrimaryKeyConstraint('item_id', 'day')
+    )
+    op.create_index(op.f('ix_item_daily_sales_day'), 'item_daily_sales', ['day'], unique=False)
+    # Backfill from live orders; app.utils.rollup keeps it current from here
+    op.execute(
+        "INSERT INTO item_daily_sales (item_id, day, qty, revenue) "
+        "SELECT order_items.item_id, date(orders.created_at), sum(order_items.qty), "
+        "sum(order_items.qty * order_items.unit_price) "
+        "FROM order_items JOIN orders ON orders.id = order_items.order_id "
+        "WHERE orders.status <> 'cancelled' "
+        "GROUP BY order_items.item_id, date(orders.created_at)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_item_daily_sales_day'), table_name='item_daily_sales')
+    op.drop_table('item_daily_sales')
@@ -0,0 +1,29 @@
+"""inventory reorder level
+
+Revision ID: b7e3f08c61d2
+Revises: 9c2e5d71a4b8
+Create Date: 2026-10-18 17:26:03.804715
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3f08c61d2'
+down_revision: Union[str, None] = '9c2e5d71a4b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 10 was the fixed threshold /reports/low-stock used before this column
+    op.add_column('inventory', sa.Column('reorder_level', sa.Integer(), server_default='10', nullable=False))
+    op.create_index('ix_inventory_stock_headroom', 'inventory', [sa.text('(stock - reorder_level)')], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_inventory_stock_headroom', table_name='inventory')
+    op.drop_column('inventory', 'reorder_level')
@@ -0,0 +1,43 @@
+"""idempotency key per user
+
+Revision ID: c4d18a9f27e5
+Revises: b7e3f08c61d2
+Create Date: 2026-10-18 19:02:41.228107
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d18a9f27e5'
+down_revision: Union[str, None] = 'b7e3f08c61d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def drop_primary_key(batch_op):
+    # SQLite's primary key is unnamed; there the batch copy simply takes the new one
+    if op.get_bind().dialect.name != 'sqlite':
+        batch_op.drop_constraint('idempotency_keys_pkey', type_='primary')
+
+
+def upgrade() -> None:
+    # Rows without a user can't be part of the new key
+    op.execute("DELETE FROM idempotency_keys WHERE user_id IS NULL")
+    with op.batch_alter_table('idempotency_keys') as batch_op:
+        batch_op.alter_column('user_id', existing_type=sa.Integer(), nullable=False)
+        drop_primary_key(batch_op)
+        batch_op.create_primary_key('idempotency_keys_pkey', ['user_id', 'key'])
+
+
+def downgrade() -> None:
+    # Two users may hold the same key; stored responses only matter for
+    # IDEMPOTENCY_TTL_HOURS, so drop them rather than pick one
+    op.execute("DELETE FROM idempotency_keys")
+    with op.batch_alter_table('idempotency_keys') as batch_op:
+        drop_primary_key(batch_op)
+        batch_op.create_primary_key('idempotency_keys_pkey', ['key'])
+        batch_op.alter_column('user_id', existing_type=sa.Integer(), nullable=True)
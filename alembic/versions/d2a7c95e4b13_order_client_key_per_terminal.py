@@ -0,0 +1,42 @@
+"""order client key per terminal
+
+Revision ID: d2a7c95e4b13
+Revises: c4d18a9f27e5
+Create Date: 2026-10-18 20:14:52.330918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a7c95e4b13'
+down_revision: Union[str, None] = 'c4d18a9f27e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.add_column(sa.Column('submitted_by', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_orders_submitted_by_users', 'users', ['submitted_by'], ['id'])
+    # Orders ingested so far: the terminal is whoever logged their "created" event
+    op.execute(
+        "UPDATE orders SET submitted_by = ("
+        "SELECT MIN(e.changed_by) FROM order_status_events e "
+        "WHERE e.order_id = orders.id AND e.status = 'created'"
+        ") WHERE client_key IS NOT NULL"
+    )
+    op.drop_index('ix_orders_client_key', table_name='orders')
+    op.create_index('ix_orders_submitted_by_client_key', 'orders', ['submitted_by', 'client_key'], unique=True)
+
+
+def downgrade() -> None:
+    # Fails if two terminals have used the same client_key since the upgrade
+    op.drop_index('ix_orders_submitted_by_client_key', table_name='orders')
+    op.create_index('ix_orders_client_key', 'orders', ['client_key'], unique=True)
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.drop_constraint('fk_orders_submitted_by_users', type_='foreignkey')
+        batch_op.drop_column('submitted_by')
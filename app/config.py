@@ -5,6 +5,86 @@ class Settings(BaseSettings):
     JWT_SECRET: str
     JWT_ALGO: str
 
+    # Serve read endpoints through an AsyncSession instead of the sync pool
+    # (compare the two with python -m app.utils.loadtest modes)
+    DB_ASYNC: bool = False
+    # Defaults to DATABASE_URL with the async driver swapped in
+    ASYNC_DATABASE_URL: str = ""
+
+    # Connection pool tuning (ignored for SQLite)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # 0 disables the server-side statement timeout
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    # Open/close a connection per checkout, for running behind PgBouncer
+    DB_NULL_POOL: bool = False
+
+    # Cache backend: "memory" (per worker), "sqlite" (shared file) or "redis".
+    # Logout revocation is stored here too: with "memory" a logged-out token is
+    # only refused by the worker that handled the logout, so run more than one
+    # worker on "sqlite" or "redis"
+    CACHE_BACKEND: str = "memory"
+    # SQLite file path or redis:// URL for the shared backends
+    CACHE_URL: str = ""
+    # Entry limit for the memory backend
+    CACHE_MAX_ENTRIES: int = 4096
+
+    MENU_CACHE_TTL: int = 300
+    USER_CACHE_TTL: int = 60
+
+    # Role checks trust the verified token's claims instead of loading the user
+    # (cached for USER_CACHE_TTL). A role change or deleted user then only takes
+    # effect when the token expires (12h), so this is opt-in.
+    AUTH_TRUST_CLAIMS: bool = False
+
+    # bcrypt cost; stored hashes with another cost are rehashed on login
+    BCRYPT_ROUNDS: int = 12
+    # Threads hashing/verifying passwords, and how many calls may wait for one.
+    # Keep the workers below the CPU count so a login burst leaves cores for
+    # everything else (python -m app.utils.loadtest login-storm shows it)
+    HASH_POOL_WORKERS: int = 2
+    HASH_POOL_QUEUE: int = 16
+
+    # Live order feed: events buffered per subscriber before it is dropped,
+    # and seconds between keep-alive comments on idle streams
+    EVENT_QUEUE_SIZE: int = 100
+    EVENT_KEEPALIVE_SECONDS: int = 15
+
+    # How long a stored Idempotency-Key response can be replayed
+    IDEMPOTENCY_TTL_HOURS: int = 24
+
+    # Seconds before a worker's in-memory top-items leaderboard reloads from
+    # item_daily_sales (picking up orders taken by other workers)
+    TOP_ITEMS_TTL: int = 60
+
+    # Dashboard reports: seconds a cached result is fresh, and how much longer
+    # it may be served stale while a background refresh replaces it
+    REPORT_CACHE_TTL: int = 10
+    REPORT_CACHE_STALE: int = 60
+    # Hot keys (read in the last REPORT_HOT_SECONDS) are refreshed ahead of
+    # expiry every REPORT_REFRESH_INTERVAL seconds
+    REPORT_REFRESH_INTERVAL: int = 5
+    REPORT_HOT_SECONDS: int = 120
+
+    # Per-route latency / DB usage metrics served at /metrics (off: no overhead)
+    METRICS_ENABLED: bool = False
+
+    # Statements slower than this many ms go to /debug/slow-queries (0 = off)
+    SLOW_QUERY_MS: int = 0
+    # Attach the plan to slow statements. On Postgres SELECTs get EXPLAIN
+    # ANALYZE, which runs them a second time (in a rolled-back savepoint);
+    # writes only get a plain EXPLAIN
+    SLOW_QUERY_EXPLAIN: bool = False
+    SLOW_QUERY_LOG_SIZE: int = 200
+    # Honour the X-Debug-Profile request header (Python vs DB time breakdown)
+    DEBUG_PROFILE: bool = False
+
+    # Where python -m app.utils.analytics export writes the columnar snapshot
+    ANALYTICS_DIR: str = "analytics"
+
     class Config:
         env_file = ".env"
 
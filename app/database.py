@@ -1,13 +1,60 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 from app.config import settings
+from app.utils import metrics, profiler
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+
+def engine_options(url: str):
+    """Pool and timeout arguments for create_engine / create_async_engine."""
+    if url.startswith("sqlite"):
+        return {}
+
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+
+    if settings.DB_NULL_POOL:
+        # PgBouncer does the pooling; keep no connections around ourselves
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+        if settings.METRICS_ENABLED:
+            # Same pool, but checkouts record how long they waited
+            options["poolclass"] = metrics.timed_pool(AsyncAdaptedQueuePool if "asyncpg" in url else QueuePool)
+
+    connect_args = {}
+    if "asyncpg" in url:
+        server_settings = {}
+        if settings.DB_STATEMENT_TIMEOUT_MS:
+            server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        if server_settings:
+            connect_args["server_settings"] = server_settings
+        if settings.DB_NULL_POOL:
+            # prepared statements don't survive PgBouncer transaction pooling
+            connect_args["statement_cache_size"] = 0
+    elif settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+if settings.METRICS_ENABLED:
+    metrics.instrument_engine(engine)
+if profiler.enabled():
+    profiler.instrument_engine(engine)
+
 Base = declarative_base()
 
 # Dependency for FastAPI routes
@@ -17,3 +64,55 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def pool_status(engine):
+    """Checked-out / idle / overflow counts for the given engine's pool."""
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+        )
+    return status
+
+
+# ---------------------- ASYNC ENGINE (optional) --------------------------
+
+ASYNC_DRIVERS = {
+    "postgresql://": "postgresql+asyncpg://",
+    "postgresql+psycopg2://": "postgresql+asyncpg://",
+    "sqlite://": "sqlite+aiosqlite://",
+}
+
+def async_url(url: str):
+    for sync_prefix, async_prefix in ASYNC_DRIVERS.items():
+        if url.startswith(sync_prefix):
+            return async_prefix + url[len(sync_prefix):]
+    return url
+
+
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.DB_ASYNC:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or async_url(SQLALCHEMY_DATABASE_URL)
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL))
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+    if settings.METRICS_ENABLED:
+        metrics.instrument_engine(async_engine.sync_engine)
+    if profiler.enabled():
+        profiler.instrument_engine(async_engine.sync_engine)
+
+# Async dependency, only usable when DB_ASYNC is on
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
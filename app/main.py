@@ -1,16 +1,49 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from app.config import settings
 from app.database import Base, engine
-from app.routers import items, orders, auth,reports
+from app.routers import items, orders, auth,reports, health
+from app.utils.metrics import MetricsMiddleware
+from app.utils import profiler
+from app.utils.report_cache import report_cache
 
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Restaurant Management System")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background refresh of hot report keys runs for the life of the worker
+    report_cache.start()
+    yield
+    await report_cache.stop()
+
+
+app = FastAPI(title="Restaurant Management System", lifespan=lifespan)
 
 app.include_router(auth.router)
+
+# Async read endpoints take precedence over the sync ones they shadow
+if settings.DB_ASYNC:
+    from app.routers.aio import items as aio_items, orders as aio_orders, reports as aio_reports
+    app.include_router(aio_items.router)
+    app.include_router(aio_orders.router)
+    app.include_router(aio_reports.router)
+
 app.include_router(items.router)
 app.include_router(orders.router)
 app.include_router(reports.router)
+app.include_router(health.router)
+
+if settings.METRICS_ENABLED:
+    from app.routers import metrics
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics.router)
+
+if profiler.enabled():
+    from app.routers import debug
+    app.add_middleware(profiler.ProfilerMiddleware)
+    app.include_router(debug.router)
 
 @app.get("/")
 def root():
-    return {"message": "Restaurant Management System API running!"}
\ No newline at end of file
+    return {"message": "Restaurant Management System API running!"}
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, ForeignKey, Numeric
+from sqlalchemy import Column, String, Text, Integer, Boolean, Date, DateTime, ForeignKey, Numeric, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -13,7 +13,7 @@ class User(Base):
     role = Column(String, default="customer")  # customer / staff / manager
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    orders = relationship("Order", back_populates="user")
+    orders = relationship("Order", back_populates="user", foreign_keys="Order.user_id")
 
 
 class Item(Base):
@@ -33,11 +33,17 @@ class Item(Base):
 
 class Inventory(Base):
     __tablename__ = "inventory"
+    __table_args__ = (
+        # low-stock lookups: WHERE stock - reorder_level <= 0
+        Index("ix_inventory_stock_headroom", text("(stock - reorder_level)")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    item_id = Column(Integer, ForeignKey("items.id"))
+    item_id = Column(Integer, ForeignKey("items.id"), unique=True, index=True)
     stock = Column(Integer, default=0)
     unit = Column(String, default="pcs")
+    # Stock at or below this raises a low_stock alert
+    reorder_level = Column(Integer, nullable=False, default=10, server_default="10")
     updated_at = Column(DateTime, default=datetime.utcnow)
 
     item = relationship("Item", back_populates="inventory")
@@ -45,14 +51,26 @@ class Inventory(Base):
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # kitchen / front-of-house views: orders in a status, oldest first
+        Index("ix_orders_status_created_at", "status", "created_at"),
+        # keyset pagination for GET /orders
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        # client keys are only unique per terminal (the staff account ingesting)
+        Index("ix_orders_submitted_by_client_key", "submitted_by", "client_key", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     status = Column(String, default="created")  # created, preparing, completed, cancelled
     total_amount = Column(Numeric(10, 2), default=0.00)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Idempotency key sent by POS terminals replaying offline orders, and the
+    # account of the terminal that sent it
+    client_key = Column(String, nullable=True)
+    submitted_by = Column(Integer, ForeignKey("users.id"), nullable=True)
 
-    user = relationship("User", back_populates="orders")
+    user = relationship("User", back_populates="orders", foreign_keys=[user_id])
     items = relationship("OrderItem", back_populates="order")
 
 
@@ -60,10 +78,58 @@ class OrderItem(Base):
     __tablename__ = "order_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"))
-    item_id = Column(Integer, ForeignKey("items.id"))
+    order_id = Column(Integer, ForeignKey("orders.id"), index=True)
+    item_id = Column(Integer, ForeignKey("items.id"), index=True)
     qty = Column(Integer, nullable=False)
     unit_price = Column(Numeric(10, 2), nullable=False)
 
     order = relationship("Order", back_populates="items")
     item = relationship("Item", back_populates="order_items")
+
+
+class DailySalesRollup(Base):
+    __tablename__ = "daily_sales_rollup"
+
+    # Maintained by app.utils.rollup as orders are created and cancelled
+    day = Column(Date, primary_key=True)
+    orders_count = Column(Integer, nullable=False, default=0)
+    gross = Column(Numeric(12, 2), nullable=False, default=0)
+    cancelled_count = Column(Integer, nullable=False, default=0)
+    cancelled_amount = Column(Numeric(12, 2), nullable=False, default=0)
+
+
+class ItemDailySales(Base):
+    __tablename__ = "item_daily_sales"
+
+    # Per-item twin of daily_sales_rollup; cancelled lines are subtracted back out
+    item_id = Column(Integer, ForeignKey("items.id"), primary_key=True)
+    day = Column(Date, primary_key=True, index=True)
+    qty = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(12, 2), nullable=False, default=0)
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    # Idempotency-Key header of a POST /orders call and the response it got;
+    # keys are chosen by clients, so they are only unique per user
+    user_id = Column(Integer, primary_key=True)
+    key = Column(String, primary_key=True)
+    request_hash = Column(String, nullable=False)
+    status_code = Column(Integer, nullable=False)
+    response = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class OrderStatusEvent(Base):
+    __tablename__ = "order_status_events"
+    __table_args__ = (
+        Index("ix_order_status_events_order_id_created_at", "order_id", "created_at"),
+    )
+
+    # Append-only log of every status an order entered, for kitchen timing
+    id = Column(Integer, primary_key=True, index=True)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    status = Column(String, nullable=False)
+    changed_by = Column(Integer, ForeignKey("users.id"))
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
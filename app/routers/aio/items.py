@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.database import get_async_db
+from app import models, schemas
+from app.utils.cache import menu_cache, serialize, make_entry, cached_response
+from app.utils.streaming import async_ndjson_stream, after_id_query, set_next_cursor
+from app.routers.items import active_items_query
+
+
+# Async read endpoints for /items, mounted ahead of app.routers.items
+# when DB_ASYNC is on. Writes stay on the sync router.
+router = APIRouter(
+    prefix="/items",
+    tags=["Items"]
+)
+
+
+# ------------------------------
+# GET ALL ITEMS (Public)
+# ------------------------------
+@router.get("/", response_model=list[schemas.ItemResponse])
+async def get_items(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    after_id: Optional[int] = None,
+    stream: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+):
+    if stream or limit or after_id is not None:
+        query = after_id_query(active_items_query(), models.Item.id, after_id, limit)
+        if stream:
+            return async_ndjson_stream(query)
+        result = await db.execute(query)
+        return set_next_cursor(response, result.all(), limit)
+
+    generation = menu_cache.generation()
+    entry = menu_cache.get("items", generation)
+    if entry is None:
+        result = await db.execute(
+            select(models.Item).where(models.Item.is_active == True)
+        )
+        entry = make_entry([
+            serialize(schemas.ItemResponse, i) for i in result.scalars()
+        ])
+        menu_cache.set("items", entry, generation=generation)
+
+    return cached_response(request, entry)
+
+
+# ------------------------------
+# GET SINGLE ITEM
+# ------------------------------
+@router.get("/{item_id}", response_model=schemas.ItemResponse)
+async def get_item(item_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    generation = menu_cache.generation()
+    entry = menu_cache.get(f"item:{item_id}", generation)
+    if entry is None:
+        result = await db.execute(
+            select(models.Item).where(
+                models.Item.id == item_id,
+                models.Item.is_active == True
+            )
+        )
+        item = result.scalars().first()
+
+        if not item:
+            raise HTTPException(404, "Item not found")
+
+        entry = make_entry(serialize(schemas.ItemResponse, item))
+        menu_cache.set(f"item:{item_id}", entry, generation=generation)
+
+    return cached_response(request, entry)
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Optional
+from app.database import get_async_db
+from app import schemas
+from app.utils.auth import require_role
+from app.utils.orders import full_order_query, full_order_response, order_list_query, order_page
+
+# Async read endpoints for /orders, mounted ahead of app.routers.orders
+# when DB_ASYNC is on. Writes stay on the sync router.
+router = APIRouter(prefix="/orders", tags=["Orders"])
+
+
+# ---- LIST ORDERS ----
+@router.get("/", response_model=schemas.OrderPage)
+async def list_orders(status: Optional[str] = None,
+                      user_id: Optional[int] = None,
+                      item_id: Optional[int] = None,
+                      start: Optional[datetime] = None,
+                      end: Optional[datetime] = None,
+                      cursor: Optional[str] = None,
+                      oldest_first: bool = False,
+                      limit: int = Query(50, ge=1, le=500),
+                      db: AsyncSession = Depends(get_async_db),
+                      user=Depends(require_role("staff", "manager"))):
+
+    rows = await db.execute(order_list_query(
+        status, user_id, item_id, start, end, cursor, oldest_first, limit
+    ))
+    return order_page(rows, limit)
+
+
+# ---- GET ORDER ----
+# ":int" so /orders/stream falls through to the sync router
+@router.get("/{order_id:int}", response_model=schemas.FullOrderResponse)
+async def get_order(order_id: int, db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(full_order_query(order_id))
+    order = full_order_response(result.all())
+    if not order:
+        raise HTTPException(404, "Order not found")
+
+    return order
@@ -0,0 +1,148 @@
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, date, timedelta
+from typing import Optional
+from app.database import get_async_db
+from app.utils.auth import require_role
+from app.utils import rollup
+from app.utils.leaderboard import top_items as leaderboard, window_query
+from app.utils.report_cache import report_cache, report_key, with_async_session
+from app.routers.reports import low_stock_query, low_stock_rows
+
+# Async versions of app.routers.reports, mounted ahead of it when
+# DB_ASYNC is on.
+router = APIRouter(
+    prefix="/reports",
+    tags=["Reports"]
+)
+
+# -----------------------
+# 1. DAILY SALES SUMMARY
+# -----------------------
+async def daily_sales_report(db: AsyncSession, today: date):
+    result = await db.execute(rollup.net_sales_query(today, today))
+    total_sales, orders_count = result.one()
+
+    return {
+        "date": today,
+        "total_sales": float(total_sales or 0),
+        "orders_count": int(orders_count or 0)
+    }
+
+
+@router.get("/daily-sales")
+async def daily_sales(
+    request: Request,
+    fresh: bool = False,
+    user=Depends(require_role("manager"))
+):
+    today = date.today()
+    return await report_cache.respond(
+        request, report_key("daily-sales", day=today),
+        with_async_session(daily_sales_report, today), fresh
+    )
+
+
+# -----------------------
+# 2. WEEKLY SALES SUMMARY
+# -----------------------
+async def weekly_sales_report(db: AsyncSession, today: date):
+
+    start = today - timedelta(days=7)
+
+    total_sales = await db.scalar(rollup.net_sales_query(start, today)) or 0
+
+    return {
+        "start_date": start,
+        "end_date": today,
+        "weekly_sales": float(total_sales)
+    }
+
+
+@router.get("/weekly-sales")
+async def weekly_sales(
+    request: Request,
+    fresh: bool = False,
+    user=Depends(require_role("manager"))
+):
+    today = date.today()
+    return await report_cache.respond(
+        request, report_key("weekly-sales", day=today),
+        with_async_session(weekly_sales_report, today), fresh
+    )
+
+
+# -----------------------
+# 3. TOP-SELLING ITEMS
+# -----------------------
+async def top_items_report(db: AsyncSession, window: str, limit: int):
+    totals = leaderboard.current(window)
+    if totals is None:
+        version = leaderboard.version()
+        result = await db.execute(window_query(window))
+        totals = leaderboard.load(window, result.all(), version)
+
+    return leaderboard.top(totals, limit)
+
+
+@router.get("/top-items")
+async def top_items(
+    request: Request,
+    limit: int = 5,
+    window: str = Query("all", pattern="^(today|week|all)$"),
+    fresh: bool = False,
+    user=Depends(require_role("manager"))
+):
+    return await report_cache.respond(
+        request, report_key("top-items", window=window, limit=limit),
+        with_async_session(top_items_report, window, limit), fresh
+    )
+
+
+# -----------------------
+# 4. LOW STOCK ITEMS
+# -----------------------
+async def low_stock_report(db: AsyncSession, threshold: Optional[int]):
+    return low_stock_rows(await db.execute(low_stock_query(threshold)))
+
+
+@router.get("/low-stock")
+async def low_stock(
+    request: Request,
+    threshold: Optional[int] = None,
+    fresh: bool = False,
+    user=Depends(require_role("manager"))
+):
+    return await report_cache.respond(
+        request, report_key("low-stock", threshold="" if threshold is None else threshold),
+        with_async_session(low_stock_report, threshold), fresh
+    )
+
+
+# -----------------------
+# 5. DATE RANGE REPORT
+# -----------------------
+@router.get("/range-sales")
+async def range_sales(
+    start_date: str,
+    end_date: str,
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(require_role("manager"))
+):
+
+    try:
+        s = datetime.strptime(start_date, "%Y-%m-%d")
+        e = datetime.strptime(end_date, "%Y-%m-%d")
+    except ValueError:
+        return {"error": "Use format YYYY-MM-DD"}
+
+    # end_date is exclusive, matching the sync router
+    total = await db.scalar(
+        rollup.net_sales_query(s.date(), e.date() - timedelta(days=1))
+    ) or 0
+
+    return {
+        "start_date": s,
+        "end_date": e,
+        "total_sales": float(total)
+    }
@@ -1,53 +1,115 @@
-from fastapi import APIRouter,Depends,HTTPException
+from fastapi import APIRouter,Depends,HTTPException,Query,Response
+from fastapi.concurrency import run_in_threadpool
 from app import schemas
-from app.database import get_db
+from app.database import get_db, SessionLocal
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from typing import Optional
 from app import models
 from app.utils import hashing
 from fastapi.security import OAuth2PasswordRequestForm
 from datetime import datetime,timedelta
 from jose import jwt
 from app.config import settings
+from app.utils.auth import token as oauth2_token, decode_token, revoke_token
+from app.utils.streaming import ndjson_stream, after_id_query, set_next_cursor
+import uuid
 
 router=APIRouter(prefix='/auth',tags=['Auth'])
 
-@router.post('/register',response_model=schemas.UserResponse)
-def register_user(user:schemas.UserCreate,db:Session=Depends(get_db) ):
-
-        email=user.email
-        user_found=db.query(models.User).filter(models.User.email==email).first()
-
-        if not user_found:
-            hashed_pw=hashing.hash_password(user.password)
-            new_user=models.User(
-                name=user.name,
-                email=user.email,
-                hashed_password=hashed_pw,
-                role=user.role 
-            )
-            db.add(new_user)
+def email_taken(email: str):
+    db = SessionLocal()
+    try:
+        return db.scalar(select(models.User.id).where(models.User.email == email)) is not None
+    finally:
+        db.close()
+
+
+def create_user(user: schemas.UserCreate, hashed_password: str):
+    """Insert the user on a short-lived session; None if the email was taken meanwhile."""
+    db = SessionLocal()
+    try:
+        new_user = models.User(
+            name=user.name,
+            email=user.email,
+            hashed_password=hashed_password,
+            role=user.role
+        )
+        db.add(new_user)
+        try:
             db.commit()
-            db.refresh(new_user)
-            return new_user
-        else:
-            raise HTTPException(401,"user alredy there") 
+        except IntegrityError:
+            db.rollback()
+            return None
+        db.refresh(new_user)
+        return new_user
+    finally:
+        db.close()
 
 
-    
-@router.post("/login")
-def login(form: OAuth2PasswordRequestForm = Depends(),
-          db: Session = Depends(get_db)):
+@router.post('/register',response_model=schemas.UserResponse)
+async def register_user(user:schemas.UserCreate):
+        # Same pattern as login: no connection is held while the hash waits on
+        # the bcrypt pool, and the wait doesn't block a threadpool thread
+        hashing.check_hash_pool()
+        if await run_in_threadpool(email_taken, user.email):
+            raise HTTPException(401,"user alredy there")
+
+        hashed_pw=await hashing.hash_password_async(user.password)
+
+        new_user=await run_in_threadpool(create_user, user, hashed_pw)
+        if new_user is None:
+            raise HTTPException(401,"user alredy there")
+        return new_user
+
+
+def find_login_user(email: str):
+    """id, role and hash of the user with `email`, on a session closed before returning."""
+    db = SessionLocal()
+    try:
+        return db.execute(
+            select(models.User.id, models.User.role, models.User.hashed_password)
+            .where(models.User.email == email)
+        ).first()
+    finally:
+        db.close()
 
-    user = db.query(models.User).filter(models.User.email == form.username).first()
+
+def store_password_hash(user_id: int, hashed_password: str):
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(models.User).where(models.User.id == user_id)
+            .values(hashed_password=hashed_password)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+@router.post("/login")
+async def login(form: OAuth2PasswordRequestForm = Depends()):
+    # No request-scoped session: the connection is back in the pool while the
+    # password check waits on the bcrypt queue, and the check is awaited
+    # rather than blocking a threadpool thread
+    hashing.check_hash_pool()
+    user = await run_in_threadpool(find_login_user, form.username)
     if not user:
         raise HTTPException(401, "Invalid Credentials")
 
-    if not hashing.verify_password(form.password, user.hashed_password):
+    valid, new_hash = await hashing.verify_and_update_async(form.password, user.hashed_password)
+    if not valid:
         raise HTTPException(401, "Incorrect Password")
 
+    # BCRYPT_ROUNDS changed since this hash was made: upgrade it in place
+    if new_hash:
+        await run_in_threadpool(store_password_hash, user.id, new_hash)
+
     token_data = {
         "user_id": user.id,
         "role": user.role,
+        "jti": uuid.uuid4().hex,
         "exp": datetime.utcnow() + timedelta(hours=12)
     }
 
@@ -56,7 +118,26 @@ def login(form: OAuth2PasswordRequestForm = Depends(),
     return {"access_token": token, "token_type": "bearer"}
 
 
+@router.post("/logout")
+def logout(access_token: str = Depends(oauth2_token)):
+    revoke_token(decode_token(access_token))
+    return {"message": "Logged out"}
+
+
 @router.get('/getUsers',response_model=list[schemas.UserResponse])
-def get_all_users(db:Session=Depends(get_db)):
-     all_users=db.query(models.User).all()
-     return all_users
\ No newline at end of file
+def get_all_users(response:Response,
+                  limit:Optional[int]=Query(None,ge=1,le=1000),
+                  after_id:Optional[int]=None,
+                  stream:bool=False,
+                  db:Session=Depends(get_db)):
+     # Columns only: no ORM instances, never the password hash
+     query=after_id_query(
+          select(models.User.id,models.User.name,models.User.email,models.User.role,models.User.created_at),
+          models.User.id,after_id,limit
+     )
+
+     if stream:
+          return ndjson_stream(query)
+
+     rows=db.execute(query).all()
+     return set_next_cursor(response,rows,limit)
\ No newline at end of file
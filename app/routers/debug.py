@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.config import settings
+from app.utils.auth import require_role
+from app.utils.profiler import slow_queries, get_profile
+
+router = APIRouter(prefix="/debug", tags=["Debug"])
+
+
+# ---- SLOW QUERY LOG ----
+@router.get("/slow-queries")
+def list_slow_queries(limit: int = Query(50, ge=1, le=1000),
+                      user=Depends(require_role("manager"))):
+    return {
+        "threshold_ms": settings.SLOW_QUERY_MS,
+        "total": slow_queries.total,
+        "queries": slow_queries.recent(limit),
+    }
+
+
+@router.delete("/slow-queries")
+def clear_slow_queries(user=Depends(require_role("manager"))):
+    slow_queries.clear()
+    return {"message": "Slow query log cleared"}
+
+
+# ---- X-Debug-Profile BREAKDOWNS ----
+@router.get("/profiles/{profile_id}")
+def read_profile(profile_id: str, user=Depends(require_role("manager"))):
+    profile = get_profile(profile_id)
+    if not profile:
+        raise HTTPException(404, "Profile not found")
+    return profile
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app import database
+from app.database import get_db, engine, pool_status
+from app.utils.cache import cache_stats
+from app.utils.events import order_events, low_stock_events
+from app.utils.report_cache import report_cache
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+# ---- DATABASE + POOL HEALTH ----
+@router.get("/db")
+def db_health(db: Session = Depends(get_db)):
+    try:
+        db.execute(text("SELECT 1"))
+    except SQLAlchemyError:
+        raise HTTPException(503, "Database unavailable")
+
+    response = {"status": "ok", "pool": pool_status(engine)}
+    if database.async_engine is not None:
+        response["async_pool"] = pool_status(database.async_engine.sync_engine)
+    return response
+
+
+# ---- CACHE HIT/MISS COUNTERS ----
+@router.get("/cache")
+def cache_health():
+    return {**cache_stats(), "reports": report_cache.stats()}
+
+
+# ---- LIVE FEED SUBSCRIBERS ----
+@router.get("/events")
+def events_health():
+    return {"orders": order_events.stats(), "low_stock": low_stock_events.stats()}
@@ -1,8 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import bindparam, insert, select, update
 from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime
 from app.database import get_db
 from app import models, schemas
 from app.utils.auth import require_role
+from app.utils.cache import menu_cache, serialize, make_entry, cached_response
+from app.utils.bulk import read_rows, validate_rows, summary
+from app.utils.streaming import ndjson_stream, after_id_query, set_next_cursor
+from app.utils.inventory import crossing, publish_crossings
 
 
 router = APIRouter(
@@ -11,6 +19,18 @@ router = APIRouter(
 )
 
 
+def active_items_query():
+    """ItemResponse columns of every active item, without building ORM objects."""
+    return select(
+        models.Item.id,
+        models.Item.name,
+        models.Item.description,
+        models.Item.price,
+        models.Item.category,
+        models.Item.is_active
+    ).where(models.Item.is_active == True)
+
+
 # ------------------------------
 # CREATE ITEM (Manager Only)
 # ------------------------------
@@ -34,6 +54,7 @@ def create_item(
     )
     db.add(inv)
     db.commit()
+    menu_cache.clear()
 
     return db_item
 
@@ -43,28 +64,52 @@ def create_item(
 # ------------------------------
 @router.get("/", response_model=list[schemas.ItemResponse])
 def get_items(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    after_id: Optional[int] = None,
+    stream: bool = False,
     db: Session = Depends(get_db),
 ):
-    items = db.query(models.Item).filter(
-        models.Item.is_active == True
-    ).all()
-    return items
+    # Paged / streamed reads go straight to the database, unbuffered
+    if stream or limit or after_id is not None:
+        query = after_id_query(active_items_query(), models.Item.id, after_id, limit)
+        if stream:
+            return ndjson_stream(query)
+        return set_next_cursor(response, db.execute(query).all(), limit)
+
+    generation = menu_cache.generation()
+    entry = menu_cache.get("items", generation)
+    if entry is None:
+        items = db.query(models.Item).filter(
+            models.Item.is_active == True
+        ).all()
+        entry = make_entry([serialize(schemas.ItemResponse, i) for i in items])
+        menu_cache.set("items", entry, generation=generation)
+
+    return cached_response(request, entry)
 
 
 # ------------------------------
 # GET SINGLE ITEM
 # ------------------------------
 @router.get("/{item_id}", response_model=schemas.ItemResponse)
-def get_item(item_id: int, db: Session = Depends(get_db)):
-    item = db.query(models.Item).filter(
-        models.Item.id == item_id,
-        models.Item.is_active == True
-    ).first()
+def get_item(item_id: int, request: Request, db: Session = Depends(get_db)):
+    generation = menu_cache.generation()
+    entry = menu_cache.get(f"item:{item_id}", generation)
+    if entry is None:
+        item = db.query(models.Item).filter(
+            models.Item.id == item_id,
+            models.Item.is_active == True
+        ).first()
 
-    if not item:
-        raise HTTPException(404, "Item not found")
+        if not item:
+            raise HTTPException(404, "Item not found")
 
-    return item
+        entry = make_entry(serialize(schemas.ItemResponse, item))
+        menu_cache.set(f"item:{item_id}", entry, generation=generation)
+
+    return cached_response(request, entry)
 
 
 # ------------------------------
@@ -87,6 +132,7 @@ def update_item(
 
     db.commit()
     db.refresh(item)
+    menu_cache.clear()
     return item
 
 
@@ -107,6 +153,7 @@ def delete_item(
     # Soft delete
     item.is_active = False
     db.commit()
+    menu_cache.clear()
 
     return {"message": f"Item {item_id} deactivated"}
 
@@ -128,8 +175,151 @@ def update_inventory(
     if not inventory:
         raise HTTPException(404, "Inventory not found")
 
+    before = inventory.stock
     inventory.stock = inv_data.stock
+    if inv_data.reorder_level is not None:
+        inventory.reorder_level = inv_data.reorder_level
+    event = crossing(item_id, before, inventory.stock, inventory.reorder_level)
     db.commit()
     db.refresh(inventory)
 
+    if event:
+        publish_crossings([event])
     return inventory
+
+
+# ------------------------------
+# BULK ITEM UPSERT (Manager Only)
+# ------------------------------
+# Item columns that are NOT NULL: an explicit null in an update row is a row error
+ITEM_REQUIRED_FIELDS = ("name", "price")
+
+
+def apply_item_rows(db: Session, rows):
+    valid, results = validate_rows(schemas.ItemBulkRow, rows)
+
+    updates = [(n, row) for n, row in valid if row.id is not None]
+    inserts = []
+    for n, row in valid:
+        if row.id is None:
+            if row.name is None or row.price is None:
+                results.append({"row": n, "status": "error", "error": "New items need a name and a price"})
+            else:
+                inserts.append((n, row))
+
+    existing = set()
+    if updates:
+        existing = {
+            item_id for (item_id,) in db.query(models.Item.id).filter(
+                models.Item.id.in_({row.id for _, row in updates})
+            )
+        }
+
+    update_rows = []
+    for n, row in updates:
+        if row.id in existing:
+            values = row.dict(exclude_unset=True)
+            nulls = [field for field in ITEM_REQUIRED_FIELDS if field in values and values[field] is None]
+            if nulls:
+                results.append({"row": n, "id": row.id, "status": "error",
+                                "error": f"{', '.join(nulls)} cannot be null"})
+                continue
+            if len(values) > 1:
+                update_rows.append(values)
+            results.append({"row": n, "id": row.id, "status": "updated"})
+        else:
+            results.append({"row": n, "id": row.id, "status": "error", "error": "Item not found"})
+
+    # One executemany per statement, all in a single transaction
+    if update_rows:
+        db.execute(update(models.Item), update_rows)
+
+    if inserts:
+        new_ids = db.execute(
+            insert(models.Item).returning(models.Item.id, sort_by_parameter_order=True),
+            [
+                {
+                    "name": row.name,
+                    "description": row.description or "",
+                    "price": row.price,
+                    "category": row.category or "",
+                    "is_active": True if row.is_active is None else row.is_active,
+                }
+                for _, row in inserts
+            ]
+        ).scalars().all()
+
+        db.execute(insert(models.Inventory), [
+            {"item_id": item_id, "stock": 0, "unit": "pcs"} for item_id in new_ids
+        ])
+        for (n, _), item_id in zip(inserts, new_ids):
+            results.append({"row": n, "id": item_id, "status": "created"})
+
+    db.commit()
+    menu_cache.clear()
+    return summary(results)
+
+
+@router.post("/bulk")
+async def bulk_upsert_items(
+    request: Request,
+    db: Session = Depends(get_db),
+    user=Depends(require_role("manager"))
+):
+    rows = await read_rows(request)
+    return await run_in_threadpool(apply_item_rows, db, rows)
+
+
+# ------------------------------
+# BULK STOCK UPDATE (Manager Only)
+# ------------------------------
+def apply_stock_rows(db: Session, rows):
+    valid, results = validate_rows(schemas.StockBulkRow, rows)
+
+    # Current stock and reorder level, to spot threshold crossings
+    existing = {}
+    if valid:
+        existing = {
+            item_id: (stock, reorder_level)
+            for item_id, stock, reorder_level in db.query(
+                models.Inventory.item_id, models.Inventory.stock, models.Inventory.reorder_level
+            ).filter(
+                models.Inventory.item_id.in_({row.item_id for _, row in valid})
+            )
+        }
+
+    now = datetime.utcnow()
+    stock_rows = []
+    crossings = []
+    for n, row in valid:
+        if row.item_id in existing:
+            before, reorder_level = existing[row.item_id]
+            event = crossing(row.item_id, before, row.stock, reorder_level)
+            if event:
+                crossings.append(event)
+            existing[row.item_id] = (row.stock, reorder_level)
+            stock_rows.append({"b_item_id": row.item_id, "b_stock": row.stock, "b_updated_at": now})
+            results.append({"row": n, "id": row.item_id, "status": "updated"})
+        else:
+            results.append({"row": n, "id": row.item_id, "status": "error", "error": "Inventory not found"})
+
+    if stock_rows:
+        db.execute(
+            update(models.Inventory.__table__)
+            .where(models.Inventory.item_id == bindparam("b_item_id"))
+            .values(stock=bindparam("b_stock"), updated_at=bindparam("b_updated_at")),
+            stock_rows
+        )
+    db.commit()
+    publish_crossings(crossings)
+    return summary(results)
+
+
+@router.post("/inventory/bulk")
+async def bulk_update_stock(
+    request: Request,
+    db: Session = Depends(get_db),
+    user=Depends(require_role("manager"))
+):
+    rows = await read_rows(request)
+    return await run_in_threadpool(apply_stock_rows, db, rows)
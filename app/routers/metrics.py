@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app import database
+from app.database import engine, pool_status
+from app.utils.metrics import render
+
+router = APIRouter(tags=["Metrics"])
+
+
+# ---- PROMETHEUS SCRAPE ENDPOINT ----
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    pools = [("sync", pool_status(engine))]
+    if database.async_engine is not None:
+        pools.append(("async", pool_status(database.async_engine.sync_engine)))
+    return PlainTextResponse(render(pools), media_type="text/plain; version=0.0.4")
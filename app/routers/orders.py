@@ -1,114 +1,341 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Optional
 from app.database import get_db
 from app import models, schemas
 from app.utils.auth import require_role
+from app.utils.inventory import lock_stock, reserve_stock, publish_crossings, OutOfStock
+from app.utils.order_status import change_status, log_status
+from app.utils import rollup, idempotency
+from app.utils.bulk import summary
+from app.utils.events import order_events, sse_response
+from app.utils.leaderboard import top_items
+from app.utils.orders import full_order_query, full_order_response, order_list_query, order_page
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
-def restore_inventory(order_id: int, db: Session):
-    order_items = db.query(models.OrderItem).filter(
-        models.OrderItem.order_id == order_id
-    ).all()
-
-    for item in order_items:
-        inventory = db.query(models.Inventory).filter(
-            models.Inventory.item_id == item.item_id
-        ).first()
-
-        inventory.stock += item.qty
-        db.commit()
-
-
-
 # ---- CREATE ORDER ----
 @router.post("/", response_model=schemas.FullOrderResponse)
 def create_order(order: schemas.OrderCreate, 
                  db: Session = Depends(get_db),
-                 user=Depends(require_role("customer", "manager"))):
+                 user=Depends(require_role("customer", "manager")),
+                 idempotency_key: Optional[str] = Header(None)):
 
-    new_order = models.Order(user_id=order.user_id)
-    db.add(new_order)
-    db.commit()
-    db.refresh(new_order)
+    # A retry of a request we already answered gets the same answer back
+    if idempotency_key:
+        request_hash = idempotency.fingerprint(order.dict())
+        replayed = idempotency.lookup(db, idempotency_key, user.id, request_hash)
+        if replayed is not None:
+            return replayed
 
-    total = 0
+    # Load every requested item in one batched query. Plain rows, not ORM
+    # instances: the commit would expire those and reload each one afterwards
+    item_ids = {item.item_id for item in order.items}
+    found = {
+        db_item.id: db_item
+        for db_item in db.query(
+            models.Item.id, models.Item.name, models.Item.price, models.Item.category
+        ).filter(models.Item.id.in_(item_ids)).all()
+    }
 
+    requested = {}
     for item in order.items:
-        db_item = db.query(models.Item).filter(models.Item.id == item.item_id).first()
-        if not db_item:
+        if item.item_id not in found:
             raise HTTPException(404, f"Item {item.item_id} not found")
+        requested[item.item_id] = requested.get(item.item_id, 0) + item.qty
+
+    # Take the stock atomically; nothing is kept if any line falls short
+    try:
+        crossings = reserve_stock(db, requested)
+    except OutOfStock as e:
+        db.rollback()
+        raise HTTPException(400, str(e))
+
+    # Build the order and its lines in the same unit of work
+    total = sum(found[item.item_id].price * item.qty for item in order.items)
+    new_order = models.Order(
+        user_id=order.user_id,
+        status="created",
+        total_amount=total,
+        created_at=datetime.utcnow()
+    )
+    db.add(new_order)
+    db.flush()
 
-        inventory = db.query(models.Inventory).filter(
-            models.Inventory.item_id == item.item_id
-        ).first()
+    # One executemany for all lines
+    if order.items:
+        db.execute(insert(models.OrderItem), [
+            {
+                "order_id": new_order.id,
+                "item_id": item.item_id,
+                "qty": item.qty,
+                "unit_price": found[item.item_id].price,
+            }
+            for item in order.items
+        ])
+    rollup.record_order(db, new_order.created_at, total)
+    rollup.record_items(db, new_order.created_at, [
+        (item.item_id, item.qty, found[item.item_id].price) for item in order.items
+    ])
+    log_status(db, [{
+        "order_id": new_order.id,
+        "status": "created",
+        "changed_by": user.id,
+        "created_at": new_order.created_at,
+    }])
+
+    # Everything the response needs is already in hand; build it before the
+    # commit expires new_order so no reload query is needed afterwards
+    response = {
+        "id": new_order.id,
+        "status": new_order.status,
+        "total_amount": total,
+        "created_at": new_order.created_at,
+        "items": [
+            {
+                "item_id": item.item_id,
+                "name": found[item.item_id].name,
+                "qty": item.qty,
+                "unit_price": found[item.item_id].price
+            }
+            for item in order.items
+        ]
+    }
 
-        if inventory.stock < item.qty:
-            raise HTTPException(400, f"Not enough stock for item {item.item_id}")
+    if idempotency_key:
+        idempotency.remember(db, idempotency_key, user.id, request_hash, response)
 
-        inventory.stock -= item.qty
+    try:
         db.commit()
+    except IntegrityError:
+        # Another request with the same key committed first: undo ours, replay theirs
+        db.rollback()
+        if not idempotency_key:
+            raise
+        stored = idempotency.find(db, idempotency_key, user.id)
+        if stored is None:
+            raise
+        return idempotency.replay(stored, request_hash)
 
-        order_item = models.OrderItem(
-            order_id=new_order.id,
-            item_id=item.item_id,
-            qty=item.qty,
-            unit_price=db_item.price,
-        )
-        db.add(order_item)
+    publish_crossings(crossings)
+    top_items.record(response["created_at"].date(), [
+        (line["item_id"], line["name"], line["qty"], line["unit_price"]) for line in response["items"]
+    ])
+    order_events.publish({
+        "type": "order_created",
+        "order_id": response["id"],
+        "status": response["status"],
+        "created_at": response["created_at"],
+        "items": response["items"],
+        "stations": sorted({found[item.item_id].category for item in order.items}),
+    })
+    return response
 
-        total += db_item.price * item.qty
 
-    new_order.total_amount = total
-    db.commit()
-    db.refresh(new_order)
+# ---- BATCH ORDER INGESTION (POS offline sync) ----
+@router.post("/batch")
+def create_orders_batch(batch: schemas.OrderBatch,
+                        db: Session = Depends(get_db),
+                        user=Depends(require_role("staff", "manager"))):
 
-    # -------- FIX: build response manually --------
-    items_response = []
+    results = []
+    pending = []
+    seen = set()
+    for row, order in enumerate(batch.orders, start=1):
+        if order.client_key in seen:
+            results.append({"row": row, "client_key": order.client_key, "status": "error",
+                            "error": "Duplicate client_key in batch"})
+        else:
+            seen.add(order.client_key)
+            pending.append((row, order))
 
-    for oi in new_order.items:
-        items_response.append({
-            "item_id": oi.item_id,
-            "name": oi.item.name,
-            "qty": oi.qty,
-            "unit_price": oi.unit_price
-        })
+    # Items first, then the stock of every item in the batch, locked: the
+    # checks below are made on rows no concurrent order can change before
+    # this batch commits
+    item_ids = {item.item_id for _, order in pending for item in order.items}
+    found = {
+        db_item.id: db_item
+        for db_item in db.query(
+            models.Item.id, models.Item.name, models.Item.price, models.Item.category
+        ).filter(models.Item.id.in_(item_ids)).all()
+    } if item_ids else {}
+    stock = lock_stock(db, item_ids)
 
-    return {
-        "id": new_order.id,
-        "status": new_order.status,
-        "total_amount": new_order.total_amount,
-        "created_at": new_order.created_at,
-        "items": items_response
-    }
+    # Orders this terminal already ingested in an earlier replay; read after
+    # the locks so a replay racing us on the same items sees what we commit
+    existing = dict(db.query(models.Order.client_key, models.Order.id).filter(
+        models.Order.submitted_by == user.id,
+        models.Order.client_key.in_(seen)
+    ).all()) if seen else {}
+
+    accepted = []
+    requested = {}
+    for row, order in pending:
+        if order.client_key in existing:
+            results.append({"row": row, "client_key": order.client_key, "status": "duplicate",
+                            "order_id": existing[order.client_key]})
+            continue
 
-                                                               
+        missing = [item.item_id for item in order.items if item.item_id not in found]
+        if missing:
+            results.append({"row": row, "client_key": order.client_key, "status": "error",
+                            "error": f"Item {missing[0]} not found"})
+            continue
+
+        wanted = {}
+        for item in order.items:
+            wanted[item.item_id] = wanted.get(item.item_id, 0) + item.qty
+        short = [item_id for item_id, qty in wanted.items() if stock.get(item_id, 0) < qty]
+        if short:
+            results.append({"row": row, "client_key": order.client_key, "status": "error",
+                            "error": f"Not enough stock for item {short[0]}"})
+            continue
+
+        for item_id, qty in wanted.items():
+            stock[item_id] -= qty
+            requested[item_id] = requested.get(item_id, 0) + qty
+        accepted.append((row, order))
+
+    if accepted:
+        try:
+            crossings = reserve_stock(db, requested)
+        except OutOfStock:
+            # Can't happen on locked rows; kept as the oversell guard of last resort
+            db.rollback()
+            raise HTTPException(409, "Stock changed while the batch was applied, retry it")
+
+        now = datetime.utcnow()
+        order_rows = [
+            {
+                "user_id": order.user_id,
+                "status": "created",
+                "total_amount": sum(found[item.item_id].price * item.qty for item in order.items),
+                "created_at": order.created_at or now,
+                "client_key": order.client_key,
+                "submitted_by": user.id,
+            }
+            for _, order in accepted
+        ]
+        order_ids = db.execute(
+            insert(models.Order).returning(models.Order.id, sort_by_parameter_order=True),
+            order_rows
+        ).scalars().all()
+        created = [
+            (row, order, order_id, order_row)
+            for (row, order), order_id, order_row in zip(accepted, order_ids, order_rows)
+        ]
+
+        line_rows = [
+            {
+                "order_id": order_id,
+                "item_id": item.item_id,
+                "qty": item.qty,
+                "unit_price": found[item.item_id].price,
+            }
+            for _, order, order_id, _ in created
+            for item in order.items
+        ]
+        if line_rows:
+            db.execute(insert(models.OrderItem), line_rows)
+
+        log_status(db, [
+            {
+                "order_id": order_id,
+                "status": "created",
+                "changed_by": user.id,
+                "created_at": order_row["created_at"],
+            }
+            for _, _, order_id, order_row in created
+        ])
+
+        # One rollup upsert (and one item sales upsert) per day touched, not per order
+        days = {}
+        for _, order, _, order_row in created:
+            created_at, count, amount, lines = days.get(order_row["created_at"].date(), (order_row["created_at"], 0, 0, []))
+            lines.extend((item.item_id, item.qty, found[item.item_id].price) for item in order.items)
+            days[created_at.date()] = (created_at, count + 1, amount + order_row["total_amount"], lines)
+        for day in sorted(days):
+            created_at, count, amount, lines = days[day]
+            rollup.record_order(db, created_at, amount, count)
+            rollup.record_items(db, created_at, lines)
+
+        try:
+            db.commit()
+        except IntegrityError:
+            # A concurrent replay of the same batch (touching no shared items) committed first
+            db.rollback()
+            raise HTTPException(409, "Batch is already being ingested, retry it")
+
+        publish_crossings(crossings)
+        for row, order, order_id, order_row in created:
+            top_items.record(order_row["created_at"].date(), [
+                (item.item_id, found[item.item_id].name, item.qty, found[item.item_id].price)
+                for item in order.items
+            ])
+            results.append({"row": row, "client_key": order.client_key, "status": "created",
+                            "order_id": order_id})
+            order_events.publish({
+                "type": "order_created",
+                "order_id": order_id,
+                "status": "created",
+                "created_at": order_row["created_at"],
+                "items": [
+                    {"item_id": item.item_id, "name": found[item.item_id].name,
+                     "qty": item.qty, "unit_price": found[item.item_id].price}
+                    for item in order.items
+                ],
+                "stations": sorted({found[item.item_id].category for item in order.items}),
+            })
+
+    return summary(results)
+
+
+# ---- LIST ORDERS ----
+@router.get("/", response_model=schemas.OrderPage)
+def list_orders(status: Optional[str] = None,
+                user_id: Optional[int] = None,
+                item_id: Optional[int] = None,
+                start: Optional[datetime] = None,
+                end: Optional[datetime] = None,
+                cursor: Optional[str] = None,
+                oldest_first: bool = False,
+                limit: int = Query(50, ge=1, le=500),
+                db: Session = Depends(get_db),
+                user=Depends(require_role("staff", "manager"))):
+
+    rows = db.execute(order_list_query(
+        status, user_id, item_id, start, end, cursor, oldest_first, limit
+    ))
+    return order_page(rows, limit)
+
+
+# ---- LIVE ORDER FEED (Server-Sent Events) ----
+@router.get("/stream")
+async def order_stream(request: Request,
+                       status: Optional[str] = None,
+                       station: Optional[str] = None,
+                       user=Depends(require_role("staff", "manager"))):
+    """
+    Push order_created / status_changed events as they are committed.
+
+    status: comma-separated statuses to receive; station: item category
+    (e.g. "drinks") a screen is interested in.
+    """
+    statuses = set(status.split(",")) if status else None
+    return sse_response(request, order_events, order_events.subscribe(statuses, station))
 
 
 # ---- GET ORDER ----
 @router.get("/{order_id}", response_model=schemas.FullOrderResponse)
 def get_order(order_id: int, db: Session = Depends(get_db)):
-    order = db.query(models.Order).filter(models.Order.id == order_id).first()
+    order = full_order_response(db.execute(full_order_query(order_id)).all())
     if not order:
         raise HTTPException(404, "Order not found")
-    
-    items_response=[]
-
-    for oi in order.items:
-        items_response.append({
-            "item_id": oi.item_id,
-            "name": oi.item.name,         # <-- Get name here
-            "qty": oi.qty,
-            "unit_price": oi.unit_price
-        })
-
-    return {
-        "id": order.id,
-        "status": order.status,
-        "total_amount": order.total_amount,
-        "created_at": order.created_at,
-        "items": items_response
-    }
+
+    return order
 
 
 # ---- UPDATE ORDER STATUS ----
@@ -117,18 +344,11 @@ def update_status(order_id: int, status: str,
                   db: Session = Depends(get_db),
                   user=Depends(require_role("staff", "manager"))):
 
-    order = db.query(models.Order).filter(models.Order.id == order_id).first()
-    if not order:
-        raise HTTPException(404, "Order not found")
-
-    valid = ["created", "preparing", "ready", "completed", "cancelled"]
-    if status not in valid:
-        raise HTTPException(400, "Invalid status")
-
-    # If order is cancelled → restore stock
-    if status == "cancelled":
-        restore_inventory(order_id, db)
-
-    order.status = status
+    changed = change_status(db, order_id, status, user.id)
     db.commit()
+
+    if changed:
+        if status == "cancelled":
+            top_items.invalidate()
+        order_events.publish({"type": "status_changed", "order_id": order_id, "status": status})
     return {"message": f"Order updated to {status}"}
@@ -1,116 +1,159 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 from datetime import datetime, date, timedelta
+from typing import Optional
 from app.database import get_db
 from app import models
 from app.utils.auth import require_role
+from app.utils import rollup, analytics
+from app.utils.leaderboard import top_items as leaderboard, window_query
+from app.utils.report_cache import report_cache, report_key, with_session
+from app.utils.events import low_stock_events, sse_response
 
 router = APIRouter(
     prefix="/reports",
     tags=["Reports"]
 )
 
+# Sections 1-4 are polled by dashboards: each is a report function computing
+# the payload plus an endpoint serving it through report_cache
+# (stale-while-revalidate, ?fresh=1 to bypass).
+
 # -----------------------
 # 1. DAILY SALES SUMMARY
 # -----------------------
-@router.get("/daily-sales")
-def daily_sales(
-    db: Session = Depends(get_db),
-    user=Depends(require_role("manager"))
-):
-    today = date.today()
-    
-    total_sales = db.query(
-        func.sum(models.Order.total_amount)
-    ).filter(
-        func.date(models.Order.created_at) == today,
-        models.Order.status != "cancelled"
-    ).scalar() or 0
-
-    orders_count = db.query(models.Order).filter(
-        func.date(models.Order.created_at) == today,
-        models.Order.status != "cancelled"
-    ).count()
+def daily_sales_report(db: Session, today: date):
+    total_sales, orders_count = rollup.net_sales(db, today, today)
 
     return {
         "date": today,
-        "total_sales": float(total_sales),
+        "total_sales": total_sales,
         "orders_count": orders_count
     }
 
 
+@router.get("/daily-sales")
+async def daily_sales(
+    request: Request,
+    fresh: bool = False,
+    user=Depends(require_role("manager"))
+):
+    today = date.today()
+    return await report_cache.respond(
+        request, report_key("daily-sales", day=today),
+        with_session(daily_sales_report, today), fresh
+    )
+
+
 # -----------------------
 # 2. WEEKLY SALES SUMMARY
 # -----------------------
-@router.get("/weekly-sales")
-def weekly_sales(
-    db: Session = Depends(get_db),
-    user=Depends(require_role("manager"))
-):
+def weekly_sales_report(db: Session, today: date):
 
-    start = date.today() - timedelta(days=7)
+    start = today - timedelta(days=7)
 
-    total_sales = db.query(
-        func.sum(models.Order.total_amount)
-    ).filter(
-        models.Order.created_at >= start,
-        models.Order.status != "cancelled"
-    ).scalar() or 0
+    total_sales, _ = rollup.net_sales(db, start, today)
 
     return {
         "start_date": start,
-        "end_date": date.today(),
-        "weekly_sales": float(total_sales)
+        "end_date": today,
+        "weekly_sales": total_sales
     }
 
 
+@router.get("/weekly-sales")
+async def weekly_sales(
+    request: Request,
+    fresh: bool = False,
+    user=Depends(require_role("manager"))
+):
+    today = date.today()
+    return await report_cache.respond(
+        request, report_key("weekly-sales", day=today),
+        with_session(weekly_sales_report, today), fresh
+    )
+
+
 # -----------------------
 # 3. TOP-SELLING ITEMS
 # -----------------------
+def top_items_report(db: Session, window: str, limit: int):
+    # Served from the in-memory leaderboard; item_daily_sales is only read to (re)load it
+    totals = leaderboard.current(window)
+    if totals is None:
+        version = leaderboard.version()
+        totals = leaderboard.load(window, db.execute(window_query(window)).all(), version)
+
+    return leaderboard.top(totals, limit)
+
+
 @router.get("/top-items")
-def top_items(
+async def top_items(
+    request: Request,
     limit: int = 5,
-    db: Session = Depends(get_db),
+    window: str = Query("all", pattern="^(today|week|all)$"),
+    fresh: bool = False,
     user=Depends(require_role("manager"))
 ):
-
-    items = db.query(
-        models.Item.name,
-        func.sum(models.OrderItem.qty).label("qty_sold")
-    ).join(models.OrderItem).join(models.Order).filter(
-        models.Order.status != "cancelled"
-    ).group_by(models.Item.name).order_by(
-        func.sum(models.OrderItem.qty).desc()
-    ).limit(limit).all()
-
-    return [{"item": r[0], "qty_sold": int(r[1])} for r in items]
+    return await report_cache.respond(
+        request, report_key("top-items", window=window, limit=limit),
+        with_session(top_items_report, window, limit), fresh
+    )
 
 
 # -----------------------
 # 4. LOW STOCK ITEMS
 # -----------------------
-@router.get("/low-stock")
-def low_stock(
-    threshold: int = 10,
-    db: Session = Depends(get_db),
-    user=Depends(require_role("manager"))
-):
-
-    items = db.query(
+def low_stock_query(threshold: Optional[int]):
+    """
+    Items at or below their own reorder level (an index lookup on
+    stock - reorder_level), or at or below a fixed `threshold` if given.
+    """
+    headroom = models.Inventory.stock - models.Inventory.reorder_level
+    return select(
         models.Item.name,
         models.Inventory.stock,
-        models.Inventory.unit
-    ).join(models.Inventory).filter(
-        models.Inventory.stock <= threshold
-    ).all()
+        models.Inventory.unit,
+        models.Inventory.reorder_level
+    ).join(models.Inventory).where(
+        headroom <= 0 if threshold is None else models.Inventory.stock <= threshold
+    )
+
 
+def low_stock_rows(rows):
     return [
-        {"item": r[0], "stock": r[1], "unit": r[2]}
-        for r in items
+        {"item": r[0], "stock": r[1], "unit": r[2], "reorder_level": r[3]}
+        for r in rows
     ]
 
 
+def low_stock_report(db: Session, threshold: Optional[int]):
+    return low_stock_rows(db.execute(low_stock_query(threshold)))
+
+
+@router.get("/low-stock")
+async def low_stock(
+    request: Request,
+    threshold: Optional[int] = None,
+    fresh: bool = False,
+    user=Depends(require_role("manager"))
+):
+    return await report_cache.respond(
+        request, report_key("low-stock", threshold="" if threshold is None else threshold),
+        with_session(low_stock_report, threshold), fresh
+    )
+
+
+@router.get("/low-stock/stream")
+async def low_stock_stream(
+    request: Request,
+    user=Depends(require_role("manager"))
+):
+    """Push low_stock / restocked events the moment an item crosses its reorder level."""
+    return sse_response(request, low_stock_events, low_stock_events.subscribe())
+
+
 # -----------------------
 # 5. DATE RANGE REPORT
 # -----------------------
@@ -128,16 +171,84 @@ def range_sales(
     except:
         return {"error": "Use format YYYY-MM-DD"}
 
-    total = db.query(
-        func.sum(models.Order.total_amount)
-    ).filter(
-        models.Order.created_at >= s,
-        models.Order.created_at <= e,
-        models.Order.status != "cancelled"
-    ).scalar() or 0
+    # end_date is exclusive, as it was when this filtered created_at <= e (midnight)
+    total, _ = rollup.net_sales(db, s.date(), e.date() - timedelta(days=1))
 
     return {
         "start_date": s,
         "end_date": e,
-        "total_sales": float(total)
+        "total_sales": total
+    }
+
+
+
+# -----------------------
+# 6. KITCHEN STAGE TIMES
+# -----------------------
+@router.get("/stage-times")
+def stage_times(
+    days: int = 7,
+    db: Session = Depends(get_db),
+    user=Depends(require_role("manager"))
+):
+    """Average seconds orders spent before entering each status, from the status log."""
+    since = datetime.utcnow() - timedelta(days=days)
+    events = models.OrderStatusEvent
+
+    # Each event paired with the one before it for the same order
+    steps = select(
+        events.status,
+        events.created_at,
+        func.lag(events.created_at).over(
+            partition_by=events.order_id, order_by=events.created_at
+        ).label("previous_at")
+    ).where(events.created_at >= since).subquery()
+
+    rows = db.execute(
+        select(steps.c.status, steps.c.created_at, steps.c.previous_at)
+        .where(steps.c.previous_at.is_not(None))
+    ).all()
+
+    totals = {}
+    for status, created_at, previous_at in rows:
+        # sqlite hands window results back as strings
+        if isinstance(previous_at, str):
+            previous_at = datetime.fromisoformat(previous_at)
+        seconds, count = totals.get(status, (0.0, 0))
+        totals[status] = (seconds + (created_at - previous_at).total_seconds(), count + 1)
+
+    return {
+        "since": since,
+        "stages": {
+            status: {"orders": count, "avg_seconds": round(seconds / count, 1)}
+            for status, (seconds, count) in totals.items()
+        }
     }
+
+
+# -----------------------
+# 7. SNAPSHOT ANALYTICS
+# -----------------------
+@router.get("/analytics")
+def analytics_report(
+    group_by: str = "",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    user=Depends(require_role("manager"))
+):
+    """
+    group_by: comma-separated hour, weekday, day, month, item, category.
+
+    Answered from the columnar snapshot written by
+    `python -m app.utils.analytics export`, never from the live tables, so
+    it is only as fresh as the last export.
+    """
+    keys = [name for name in group_by.split(",") if name]
+    try:
+        rows = analytics.run_report(keys, start, end)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    except RuntimeError as e:
+        raise HTTPException(503, str(e))
+
+    return {"group_by": keys, "start": start, "end": end, "rows": rows}
@@ -40,15 +40,32 @@ class ItemResponse(ItemBase):
         orm_mode = True
 
 
+class ItemBulkRow(BaseModel):
+    # Rows with an id update only the fields they carry; rows without one
+    # create a new item and need at least name and price
+    id: Optional[int] = None
+    name: Optional[str] = None
+    description: Optional[str] = None
+    price: Optional[float] = None
+    category: Optional[str] = None
+    is_active: Optional[bool] = None
+
+
 # ---------------------- INVENTORY SCHEMAS --------------------------
 
 class InventoryBase(BaseModel):
     item_id: int
     stock: int
     unit: str
+    reorder_level: int
 
 class InventoryUpdate(BaseModel):
     stock: int
+    reorder_level: Optional[int] = None
+
+class StockBulkRow(BaseModel):
+    item_id: int
+    stock: int
 
 class InventoryResponse(InventoryBase):
     id: int
@@ -67,6 +84,15 @@ class OrderCreate(BaseModel):
     user_id: int
     items: List[OrderItemBase]
 
+class BatchOrder(OrderCreate):
+    # unique per order on the terminal; replaying it never creates a second order
+    client_key: str
+    # when the terminal took the order, if it was offline at the time
+    created_at: Optional[datetime] = None
+
+class OrderBatch(BaseModel):
+    orders: List[BatchOrder]
+
 class OrderResponse(BaseModel):
     id: int
     status: str
@@ -96,3 +122,17 @@ class FullOrderResponse(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class OrderSummary(BaseModel):
+    id: int
+    user_id: Optional[int]
+    status: str
+    total_amount: float
+    created_at: datetime
+
+
+class OrderPage(BaseModel):
+    orders: List[OrderSummary]
+    # pass back as ?cursor= to fetch the next page; null on the last page
+    next_cursor: Optional[str]
@@ -0,0 +1,358 @@
+import argparse
+import json
+import os
+import shutil
+import time
+from datetime import datetime, date
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app import models
+from app.config import settings
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+EXPORT_BATCH_SIZE = 10000
+# One .npy file per column in every month partition
+COLUMNS = {
+    "order_id": "int64",
+    "ts": "int64",        # created_at, seconds since the epoch (UTC)
+    "item_id": "int32",
+    "qty": "int32",
+    "revenue": "float64",
+}
+GROUP_KEYS = ["hour", "weekday", "day", "month", "item", "category"]
+
+
+def require_numpy():
+    if np is None:
+        raise RuntimeError("Sales analytics requires the 'numpy' package")
+
+
+def partition_name(month: date):
+    return f"orders-{month:%Y-%m}"
+
+
+def partitions(directory: str):
+    """(month, path) of every exported month, oldest first."""
+    if not os.path.isdir(directory):
+        return []
+    found = []
+    for name in sorted(os.listdir(directory)):
+        if name.startswith("orders-") and len(name) == 14:
+            found.append((datetime.strptime(name[7:], "%Y-%m").date(), os.path.join(directory, name)))
+    return found
+
+
+# ---------------------- EXPORT --------------------------
+
+def export_query(since: date = None):
+    """Every live order line, oldest first, as the columns the snapshot stores."""
+    query = select(
+        models.OrderItem.order_id,
+        models.Order.created_at,
+        models.OrderItem.item_id,
+        models.OrderItem.qty,
+        models.OrderItem.unit_price
+    ).join(models.Order).where(
+        models.Order.status != "cancelled"
+    ).order_by(models.Order.created_at, models.OrderItem.id)
+    if since is not None:
+        query = query.where(models.Order.created_at >= since)
+    return query
+
+
+def write_partition(directory: str, month: date, chunks):
+    """Write one month's column chunks, swapping the directory in whole."""
+    path = os.path.join(directory, partition_name(month))
+    tmp, old = path + ".tmp", path + ".old"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for name, dtype in COLUMNS.items():
+        np.save(os.path.join(tmp, name + ".npy"), np.concatenate(chunks[name]).astype(dtype))
+    if os.path.exists(path):
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def export(db: Session, directory: str = None, since: date = None):
+    """
+    Snapshot live order lines into memory-mappable .npy columns, one
+    directory per month, under ANALYTICS_DIR.
+
+    Rows come off a server-side cursor EXPORT_BATCH_SIZE at a time and only
+    the month being written is held in memory. Months from `since` on (all
+    of them if omitted) are rewritten, and partitions in that range with no
+    live rows left are removed; older partitions are left alone.
+    Returns {month: rows written}.
+    """
+    require_numpy()
+    directory = directory or settings.ANALYTICS_DIR
+    os.makedirs(directory, exist_ok=True)
+    if since is not None:
+        since = since.replace(day=1)
+
+    # Item names and categories go next to the partitions, read at query time
+    items = {
+        item_id: [name, category]
+        for item_id, name, category in db.execute(
+            select(models.Item.id, models.Item.name, models.Item.category)
+        )
+    }
+    with open(os.path.join(directory, "items.json"), "w") as f:
+        json.dump(items, f)
+
+    written = {}
+    month, chunks = None, None
+    result = db.execute(export_query(since).execution_options(yield_per=EXPORT_BATCH_SIZE))
+    for batch in result.partitions():
+        order_id, created_at, item_id, qty, unit_price = zip(*batch)
+        ts = np.array(created_at, dtype="datetime64[s]").astype("int64")
+        months = np.array(created_at, dtype="datetime64[M]")
+        qty = np.array(qty, dtype="int32")
+        columns = {
+            "order_id": np.array(order_id, dtype="int64"),
+            "ts": ts,
+            "item_id": np.array(item_id, dtype="int32"),
+            "qty": qty,
+            "revenue": qty * np.array(unit_price, dtype="float64"),
+        }
+        # Rows are in created_at order, so a batch splits into contiguous months
+        bounds = np.flatnonzero(months[1:] != months[:-1]) + 1
+        for start, end in zip(np.r_[0, bounds], np.r_[bounds, len(ts)]):
+            batch_month = months[start].item()
+            if batch_month != month:
+                if month is not None:
+                    write_partition(directory, month, chunks)
+                    written[month] = sum(len(c) for c in chunks["ts"])
+                month, chunks = batch_month, {name: [] for name in COLUMNS}
+            for name in COLUMNS:
+                chunks[name].append(columns[name][start:end])
+
+    if month is not None:
+        write_partition(directory, month, chunks)
+        written[month] = sum(len(c) for c in chunks["ts"])
+
+    # Months whose orders were all cancelled (or deleted) since the last export
+    for old_month, path in partitions(directory):
+        if (since is None or old_month >= since) and old_month not in written:
+            shutil.rmtree(path)
+    return written
+
+
+# ---------------------- REPORT ENGINE --------------------------
+
+def load_items(directory: str):
+    path = os.path.join(directory, "items.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return {int(item_id): tuple(value) for item_id, value in json.load(f).items()}
+
+
+def group_keys(name: str, columns, items):
+    """Vectorized key column for one group_by name."""
+    ts = columns["ts"]
+    if name == "hour":
+        return (ts // 3600) % 24
+    if name == "weekday":
+        # 1970-01-01 was a Thursday; 0 = Monday
+        return (ts // 86400 + 3) % 7
+    if name == "day":
+        return ts // 86400
+    if name == "month":
+        return ts.astype("datetime64[s]").astype("datetime64[M]").astype("int64")
+    if name == "item":
+        return columns["item_id"].astype("int64")
+    if name == "category":
+        categories = sorted({category or "" for _, category in items.values()})
+        codes = np.full(max(items, default=0) + 1, len(categories), dtype="int64")
+        for item_id, (_, category) in items.items():
+            codes[item_id] = categories.index(category or "")
+        item_ids = columns["item_id"]
+        known = item_ids < len(codes)
+        return np.where(known, codes[np.where(known, item_ids, 0)], len(categories))
+    raise ValueError(f"Unknown group_by {name!r}, use: {', '.join(GROUP_KEYS)}")
+
+
+def key_label(name: str, value: int, items):
+    if name == "day":
+        return str(np.datetime64(value, "D"))
+    if name == "month":
+        return str(np.datetime64(value, "M"))
+    if name == "item":
+        return items.get(value, (f"item {value}", None))[0]
+    if name == "category":
+        categories = sorted({category or "" for _, category in items.values()})
+        return categories[value] if value < len(categories) else None
+    return value
+
+
+def aggregate(columns, keys):
+    """
+    Lines, qty, revenue and distinct orders per distinct combination of the
+    `keys` columns. Keys are packed into one int64 code so every step is a
+    1-D sort / bincount.
+    """
+    codes = np.zeros(len(columns["ts"]), dtype="int64")
+    values = []
+    for key in keys:
+        distinct, inverse = np.unique(key, return_inverse=True)
+        codes = codes * len(distinct) + inverse
+        values.append(distinct)
+
+    group_codes, inverse = np.unique(codes, return_inverse=True)
+    size = len(group_codes)
+    lines = np.bincount(inverse, minlength=size)
+    qty = np.bincount(inverse, weights=columns["qty"], minlength=size)
+    revenue = np.bincount(inverse, weights=columns["revenue"], minlength=size)
+    order_ids = columns["order_id"]
+    pairs = np.unique(inverse * (int(order_ids.max()) + 1) + order_ids)
+    orders = np.bincount(pairs // (int(order_ids.max()) + 1), minlength=size)
+
+    # Unpack the group codes back into one column per key
+    decoded, rest = [], group_codes
+    for distinct in reversed(values):
+        decoded.append(distinct[rest % len(distinct)])
+        rest = rest // len(distinct)
+    groups = np.column_stack(decoded[::-1]) if decoded else np.zeros((size, 0), dtype="int64")
+    return groups, lines, qty, revenue, orders
+
+
+def run_report(group_by, start: date = None, end: date = None, directory: str = None):
+    """
+    Group-by / sum / count over the exported snapshot, without the database.
+
+    `group_by` is a list of GROUP_KEYS names; start/end are inclusive days.
+    Each month is aggregated on its own memory-mapped columns and the
+    partial results merged, so memory is bounded by one month's rows.
+    """
+    require_numpy()
+    directory = directory or settings.ANALYTICS_DIR
+    for name in group_by:
+        if name not in GROUP_KEYS:
+            raise ValueError(f"Unknown group_by {name!r}, use: {', '.join(GROUP_KEYS)}")
+
+    items = load_items(directory)
+    start_ts = int(np.datetime64(start, "s").astype("int64")) if start else None
+    end_ts = int((np.datetime64(end, "D") + 1).astype("datetime64[s]").astype("int64")) if end else None
+
+    totals = {}
+    for month, path in partitions(directory):
+        if start and month < start.replace(day=1):
+            continue
+        if end and month > end:
+            continue
+        columns = {
+            name: np.load(os.path.join(path, name + ".npy"), mmap_mode="r")
+            for name in COLUMNS
+        }
+        if start_ts is not None or end_ts is not None:
+            mask = np.ones(len(columns["ts"]), dtype=bool)
+            if start_ts is not None:
+                mask &= columns["ts"] >= start_ts
+            if end_ts is not None:
+                mask &= columns["ts"] < end_ts
+            columns = {name: column[mask] for name, column in columns.items()}
+        if not len(columns["ts"]):
+            continue
+
+        keys = [group_keys(name, columns, items) for name in group_by]
+        for group, lines, qty, revenue, orders in zip(*aggregate(columns, keys)):
+            key = tuple(int(value) for value in group)
+            current = totals.get(key, (0, 0, 0.0, 0))
+            totals[key] = (
+                current[0] + int(orders),
+                current[1] + int(lines),
+                current[2] + float(revenue),
+                current[3] + int(qty),
+            )
+
+    return [
+        {
+            **{name: key_label(name, value, items) for name, value in zip(group_by, key)},
+            "orders": orders,
+            "lines": lines,
+            "qty": qty,
+            "revenue": round(revenue, 2),
+        }
+        for key, (orders, lines, revenue, qty) in sorted(totals.items())
+    ]
+
+
+# ---------------------- BENCHMARK --------------------------
+
+def sql_report(db: Session, group_by: str):
+    """
+    The same report straight from the OLTP tables, for `bench` (item / category only).
+
+    Items are grouped by id like the snapshot engine and labelled with their
+    name, so two items sharing a name stay apart in both.
+    """
+    if group_by == "item":
+        label, keys = models.Item.name, [models.OrderItem.item_id, models.Item.name]
+    else:
+        label, keys = models.Item.category, [models.Item.category]
+    return db.execute(
+        select(
+            label,
+            func.count(func.distinct(models.OrderItem.order_id)),
+            func.count(models.OrderItem.id),
+            func.sum(models.OrderItem.qty),
+            func.sum(models.OrderItem.qty * models.OrderItem.unit_price)
+        ).join(models.Order).join(models.Item).where(
+            models.Order.status != "cancelled"
+        ).group_by(*keys)
+    ).all()
+
+
+def bench(db: Session, group_by: str, repeat: int = 5):
+    """Best-of-`repeat` seconds for the SQL report vs the snapshot engine."""
+    timings = {}
+    for label, run in [("sql", lambda: sql_report(db, group_by)),
+                       ("snapshot", lambda: run_report([group_by]))]:
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        timings[label] = round(best, 4)
+    return timings
+
+
+if __name__ == "__main__":
+    # python -m app.utils.analytics export [--since YYYY-MM-DD]
+    # python -m app.utils.analytics report --group-by category,hour [--start ...] [--end ...]
+    # python -m app.utils.analytics bench --group-by item|category
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Columnar sales snapshot and reports")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_cmd = commands.add_parser("export")
+    export_cmd.add_argument("--since", type=date.fromisoformat)
+    report_cmd = commands.add_parser("report")
+    report_cmd.add_argument("--group-by", default="")
+    report_cmd.add_argument("--start", type=date.fromisoformat)
+    report_cmd.add_argument("--end", type=date.fromisoformat)
+    bench_cmd = commands.add_parser("bench")
+    bench_cmd.add_argument("--group-by", choices=["item", "category"], default="category")
+    bench_cmd.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == "report":
+        group_by = [name for name in args.group_by.split(",") if name]
+        print(json.dumps(run_report(group_by, args.start, args.end), indent=2))
+    else:
+        db = SessionLocal()
+        try:
+            if args.command == "export":
+                for month, rows in export(db, since=args.since).items():
+                    print(f"{month:%Y-%m}: {rows} rows")
+            else:
+                print(json.dumps(bench(db, args.group_by, args.repeat)))
+        finally:
+            db.close()
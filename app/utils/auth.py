@@ -1,30 +1,96 @@
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import Depends,HTTPException
 from sqlalchemy.orm import Session
+from datetime import datetime
+import time
 from app.database import get_db
 from jose import jwt,JWTError
 from app.config import settings
 from app import models
+from app.utils.cache import get_cache
 
 token=OAuth2PasswordBearer(tokenUrl='auth/login')
 
-def get_current_user(token:str =Depends(token),db:Session=Depends(get_db)):
-    try:
-        payload=jwt.decode(token,key=settings.JWT_SECRET,algorithms=[settings.JWT_ALGO])
-        user_id=payload.get("user_id")
+# Public user fields by id; never holds the password hash
+user_cache=get_cache("users", ttl=settings.USER_CACHE_TTL)
 
-        user=db.query(models.User).filter(models.User.id==user_id).first()
+# jti of every logged-out token, kept until the token would have expired;
+# pinned so other cache traffic can never evict a revocation early. Only as
+# shared as CACHE_BACKEND: the memory backend revokes in this worker alone
+revoked_tokens=get_cache("revoked", ttl=12*3600, pinned=True)
 
-        if not user:
-           raise HTTPException(401, "User not found")
-        return user
-    
+
+class TokenUser:
+    """The caller as described by a verified token, without a DB lookup."""
+
+    def __init__(self, payload:dict):
+        self.id=payload.get("user_id")
+        self.role=payload.get("role")
+
+
+def decode_token(token:str):
+    try:
+        payload=jwt.decode(token,key=settings.JWT_SECRET,algorithms=[settings.JWT_ALGO])
     except JWTError:
         raise HTTPException(401, "Invalid token")
 
+    jti=payload.get("jti")
+    if jti and revoked_tokens.get(jti):
+        raise HTTPException(401, "Token revoked")
+    return payload
+
+
+def revoke_token(payload:dict):
+    jti=payload.get("jti")
+    if not jti:
+        return
+    ttl=int(payload.get("exp", 0) - time.time())
+    if ttl > 0:
+        revoked_tokens.set(jti, True, ttl=ttl)
+
+
+def load_user(user_id:int, db:Session):
+    generation=user_cache.generation()
+    row=user_cache.get(str(user_id), generation)
+    if row is not None:
+        return models.User(
+            id=row["id"],
+            name=row["name"],
+            email=row["email"],
+            role=row["role"],
+            created_at=datetime.fromisoformat(row["created_at"]) if row["created_at"] else None
+        )
+
+    user=db.query(models.User).filter(models.User.id==user_id).first()
+    if user:
+        user_cache.set(str(user_id), {
+            "id": user.id,
+            "name": user.name,
+            "email": user.email,
+            "role": user.role,
+            "created_at": user.created_at.isoformat() if user.created_at else None
+        }, generation=generation)
+    return user
+
+
+def get_token_user(token:str =Depends(token)):
+    return TokenUser(decode_token(token))
+
+
+def get_current_user(token:str =Depends(token),db:Session=Depends(get_db)):
+    payload=decode_token(token)
+    user=load_user(payload.get("user_id"), db)
+
+    if not user:
+       raise HTTPException(401, "User not found")
+    return user
+
 
 def require_role(*allowed_roles):
-    def role_checker(user: models.User = Depends(get_current_user)):
+    # Fast path: the role claim was signed by /auth/login, no DB needed
+    current_user = get_token_user if settings.AUTH_TRUST_CLAIMS else get_current_user
+
+    def role_checker(user: models.User = Depends(current_user)):
         if user.role not in allowed_roles:
             raise HTTPException(403, "Not allowed")
         return user
@@ -0,0 +1,65 @@
+import csv
+import io
+from fastapi import HTTPException, Request
+from pydantic import ValidationError
+
+
+async def read_rows(request: Request):
+    """
+    Rows of a bulk upload as a list of dicts.
+
+    Accepts a JSON array body, a text/csv body, or a multipart form with the
+    CSV in a "file" field. Empty CSV cells are dropped so optional columns
+    fall back to their defaults.
+    """
+    content_type = request.headers.get("content-type", "")
+
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(400, "Upload the CSV in a 'file' field")
+        return parse_csv((await upload.read()).decode("utf-8-sig"))
+
+    if content_type.startswith("text/csv"):
+        return parse_csv((await request.body()).decode("utf-8-sig"))
+
+    try:
+        rows = await request.json()
+    except ValueError:
+        raise HTTPException(400, "Body must be a JSON array or CSV")
+    if not isinstance(rows, list):
+        raise HTTPException(400, "Body must be a JSON array or CSV")
+    return rows
+
+
+def parse_csv(text: str):
+    return [
+        {key.strip(): value for key, value in row.items() if key and value not in (None, "")}
+        for row in csv.DictReader(io.StringIO(text))
+    ]
+
+
+def validate_rows(schema, rows):
+    """(valid, results): valid is [(row_number, model)], results holds the rejects."""
+    valid, results = [], []
+    for number, row in enumerate(rows, start=1):
+        try:
+            if not isinstance(row, dict):
+                raise ValueError("Row must be an object")
+            valid.append((number, schema(**row)))
+        except ValidationError as e:
+            error = e.errors()[0]
+            field = ".".join(str(part) for part in error["loc"])
+            results.append({"row": number, "status": "error", "error": f"{field}: {error['msg']}"})
+        except (ValueError, TypeError) as e:
+            results.append({"row": number, "status": "error", "error": str(e)})
+    return valid, results
+
+
+def summary(results):
+    results.sort(key=lambda r: r["row"])
+    counts = {}
+    for r in results:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    return {"counts": counts, "results": results}
@@ -0,0 +1,300 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from app.config import settings
+
+
+# ---------------------- BACKENDS --------------------------
+#
+# A backend stores JSON-ready values under string keys with a per-key TTL.
+# "memory" is per process; "sqlite" and "redis" are shared by every worker
+# on the host / cluster.
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire after their TTL.
+
+    Entries set with pinned=True are kept outside the LRU and only dropped
+    once expired, for data that must not be lost to memory pressure.
+    """
+
+    # Expired pinned entries are swept on every SWEEP_EVERY-th pinned write
+    SWEEP_EVERY = 256
+
+    def __init__(self, maxsize: int = 1024, ttl: int = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._pinned = {}
+        self._pinned_writes = 0
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._counters:
+                return self._counters[key]
+            entry = self._data.get(key)
+            if entry is None:
+                entry = self._pinned.get(key)
+                if entry is None or entry[0] < time.monotonic():
+                    return None
+                return entry[1]
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl: int = None, pinned: bool = False):
+        with self._lock:
+            expires = time.monotonic() + (ttl or self.ttl)
+            if pinned:
+                self._pinned[key] = (expires, value)
+                self._pinned_writes += 1
+                if self._pinned_writes % self.SWEEP_EVERY == 0:
+                    now = time.monotonic()
+                    self._pinned = {k: e for k, e in self._pinned.items() if e[0] >= now}
+                return
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+            self._pinned.pop(key, None)
+
+    def incr(self, key):
+        # counters live outside the LRU so they are never evicted
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._pinned.clear()
+            self._counters.clear()
+
+    def size(self):
+        return len(self._data) + len(self._pinned)
+
+
+class SQLiteBackend:
+    """Cache shared by all workers on one host through a WAL-mode SQLite file."""
+
+    # Expired rows (and keys of superseded generations, once their TTL is up)
+    # are deleted on every PURGE_EVERY-th write
+    PURGE_EVERY = 500
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)"
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires >= ?",
+            (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, value, ttl: int, pinned: bool = False):
+        # Rows are only removed once expired, so every entry is pinned
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+            (key, json.dumps(value, default=str), time.time() + ttl)
+        )
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            self.purge_expired()
+
+    def purge_expired(self):
+        self._conn().execute("DELETE FROM cache WHERE expires < ?", (time.time(),))
+
+    def delete(self, key):
+        self._conn().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def incr(self, key):
+        conn = self._conn()
+        conn.execute(
+            "INSERT INTO cache (key, value, expires) VALUES (?, '1', 1e18) "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1",
+            (key,)
+        )
+        return int(conn.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()[0])
+
+    def clear(self):
+        self._conn().execute("DELETE FROM cache")
+
+    def size(self):
+        return self._conn().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+class RedisBackend:
+    """Cache shared across hosts. `client` may be any redis.Redis-compatible object."""
+
+    def __init__(self, url: str = "", client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package")
+            client = redis.Redis.from_url(url)
+        self.client = client
+
+    def get(self, key):
+        value = self.client.get(key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl: int, pinned: bool = False):
+        # Redis only evicts under maxmemory; run it with maxmemory-policy
+        # noeviction if pinned keys (token revocations) must survive that
+        self.client.set(key, json.dumps(value, default=str), ex=ttl)
+
+    def delete(self, key):
+        self.client.delete(key)
+
+    def incr(self, key):
+        return int(self.client.incr(key))
+
+    def clear(self):
+        self.client.flushdb()
+
+    def size(self):
+        return self.client.dbsize()
+
+
+def make_backend():
+    if settings.CACHE_BACKEND == "sqlite":
+        return SQLiteBackend(
+            settings.CACHE_URL or os.path.join(tempfile.gettempdir(), "rms_cache.sqlite3")
+        )
+    if settings.CACHE_BACKEND == "redis":
+        return RedisBackend(settings.CACHE_URL or "redis://localhost:6379/0")
+    return TTLCache(maxsize=settings.CACHE_MAX_ENTRIES)
+
+
+backend = make_backend()
+
+
+# ---------------------- NAMESPACED CACHE --------------------------
+
+class Cache:
+    """
+    A namespace inside the configured backend.
+
+    Keys are stored as "<namespace>:<generation>:<key>". clear() bumps the
+    generation counter in the backend itself, so with a shared backend an
+    invalidation in one worker is seen by every other worker on its next read.
+    A pinned namespace's entries are never evicted before they expire.
+    """
+
+    def __init__(self, namespace: str, ttl: int, backend, pinned: bool = False):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.backend = backend
+        self.pinned = pinned
+        self.hits = 0
+        self.misses = 0
+
+    def generation(self):
+        """
+        Current generation. Read it before loading the data to cache and pass
+        it to get()/set(): a clear() landing in between then makes the write
+        land in the old generation, where nobody reads it, instead of
+        publishing pre-update data under the new one.
+        """
+        return self.backend.get(f"{self.namespace}:gen") or 0
+
+    def _key(self, key, generation=None):
+        if generation is None:
+            generation = self.generation()
+        return f"{self.namespace}:{generation}:{key}"
+
+    def get(self, key, generation=None):
+        value = self.backend.get(self._key(key, generation))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value, ttl: int = None, generation=None):
+        self.backend.set(self._key(key, generation), value, ttl or self.ttl, pinned=self.pinned)
+
+    def delete(self, key):
+        self.backend.delete(self._key(key))
+
+    def clear(self):
+        self.backend.incr(f"{self.namespace}:gen")
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+caches = {}
+
+def get_cache(namespace: str, ttl: int, pinned: bool = False):
+    """Return the process-wide Cache for `namespace`, creating it on first use."""
+    if namespace not in caches:
+        caches[namespace] = Cache(namespace, ttl, backend, pinned)
+    return caches[namespace]
+
+
+def cache_stats():
+    return {
+        "backend": type(backend).__name__,
+        "entries": backend.size(),
+        "namespaces": {name: cache.stats() for name, cache in caches.items()},
+    }
+
+
+# ---------------------- MENU CACHE --------------------------
+
+# Serialized ItemResponse payloads, invalidated by every menu write
+menu_cache = get_cache("menu", ttl=settings.MENU_CACHE_TTL)
+
+
+def serialize(schema, obj):
+    """Validate an ORM object through `schema` and return a JSON-ready dict."""
+    return schema(**{name: getattr(obj, name) for name in schema.__fields__}).dict()
+
+
+def make_entry(payload):
+    """Pair a JSON-ready payload with its ETag."""
+    body = json.dumps(payload, sort_keys=True, default=str)
+    return {"payload": payload, "etag": '"' + hashlib.sha1(body.encode()).hexdigest() + '"'}
+
+
+def cached_response(request: Request, entry):
+    """304 when the client already holds this version, otherwise the payload."""
+    headers = {"ETag": entry["etag"]}
+    if request.headers.get("if-none-match") == entry["etag"]:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(entry["payload"], headers=headers)
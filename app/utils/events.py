@@ -0,0 +1,107 @@
+import asyncio
+import json
+import threading
+from typing import Optional
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from app.config import settings
+
+
+class Subscriber:
+    """One listener on a broker, with its own bounded queue."""
+
+    def __init__(self, queue_size: int, statuses: Optional[set] = None, station: Optional[str] = None):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.statuses = statuses
+        self.station = station
+        self.dropped = False
+
+    def matches(self, event: dict):
+        if self.statuses and event.get("status") not in self.statuses:
+            return False
+        # Only new orders say which stations they involve; status changes
+        # go to every station so screens can clear or move the order.
+        if self.station and "stations" in event and self.station not in event["stations"]:
+            return False
+        return True
+
+
+class EventBroker:
+    """
+    In-process fan-out of events to async subscribers.
+
+    publish() may be called from any thread (sync routes run in the
+    threadpool); each event is handed to the subscriber's own event loop.
+    A subscriber whose queue is full is dropped rather than allowed to
+    buffer without bound or slow down everyone else.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, statuses: Optional[set] = None, station: Optional[str] = None):
+        sub = Subscriber(self.queue_size, statuses, station)
+        with self._lock:
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def publish(self, event: dict):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            if sub.matches(event):
+                sub.loop.call_soon_threadsafe(self._deliver, sub, event)
+
+    def _deliver(self, sub: Subscriber, event: dict):
+        if sub.dropped:
+            return
+        try:
+            sub.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            sub.dropped = True
+            self.dropped += 1
+            self.unsubscribe(sub)
+
+    def stats(self):
+        return {"subscribers": len(self._subscribers), "dropped": self.dropped}
+
+
+# order_created / status_changed events for kitchen and front-of-house screens
+order_events = EventBroker(settings.EVENT_QUEUE_SIZE)
+
+# low_stock / restocked events when an item's stock crosses its reorder level
+low_stock_events = EventBroker(settings.EVENT_QUEUE_SIZE)
+
+
+def sse_message(event: dict):
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+def sse_response(request: Request, broker: EventBroker, sub: Subscriber):
+    """Stream `sub`'s events as Server-Sent Events until the client goes away."""
+    async def events():
+        try:
+            while not sub.dropped:
+                if await request.is_disconnected():
+                    break
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), settings.EVENT_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield sse_message(event)
+        finally:
+            broker.unsubscribe(sub)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
@@ -1,9 +1,75 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
 from passlib.context import CryptContext
+from app.config import settings
+
+# Pinning min/max to the configured cost makes needs_update() flag hashes
+# made with any other cost, cheaper or dearer.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt releases the GIL, so a small thread pool hashes in parallel while
+# capping how many request threads a login burst can tie up.
+hash_pool = ThreadPoolExecutor(
+    max_workers=settings.HASH_POOL_WORKERS, thread_name_prefix="bcrypt"
+)
+hash_slots = threading.BoundedSemaphore(settings.HASH_POOL_WORKERS + settings.HASH_POOL_QUEUE)
+
+
+def pool_full():
+    return HTTPException(429, "Too many password checks in progress, try again", headers={"Retry-After": "1"})
+
+
+def check_hash_pool():
+    """
+    Answer 429 now if the hash queue is already full, so a login burst is
+    turned away before it takes a DB connection for the user lookup.
+    A slot can still be gone by submit time; submit_to_hash_pool checks again.
+    """
+    if not hash_slots.acquire(blocking=False):
+        raise pool_full()
+    hash_slots.release()
+
+
+def submit_to_hash_pool(fn, *args):
+    """Future of fn on the hash pool, or answer 429 straight away if the queue is full."""
+    if not hash_slots.acquire(blocking=False):
+        raise pool_full()
+
+    try:
+        future = hash_pool.submit(fn, *args)
+    except Exception:
+        hash_slots.release()
+        raise
+    future.add_done_callback(lambda f: hash_slots.release())
+    return future
+
+
+def run_in_hash_pool(fn, *args):
+    return submit_to_hash_pool(fn, *args).result()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def hash_password(password: str):
-    return pwd_context.hash(password)
+    return run_in_hash_pool(pwd_context.hash, password)
 
 def verify_password(plain, hashed):
-    return pwd_context.verify(plain, hashed)
+    return run_in_hash_pool(pwd_context.verify, plain, hashed)
+
+def verify_and_update(plain, hashed):
+    """(valid, new_hash) where new_hash is set when the stored cost is outdated."""
+    return run_in_hash_pool(pwd_context.verify_and_update, plain, hashed)
+
+async def verify_and_update_async(plain, hashed):
+    """verify_and_update awaited from the event loop, holding no request thread."""
+    return await asyncio.wrap_future(submit_to_hash_pool(pwd_context.verify_and_update, plain, hashed))
+
+async def hash_password_async(password: str):
+    """hash_password awaited from the event loop, holding no request thread."""
+    return await asyncio.wrap_future(submit_to_hash_pool(pwd_context.hash, password))
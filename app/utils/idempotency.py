@@ -0,0 +1,81 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+from app import models
+from app.config import settings
+
+
+def fingerprint(payload):
+    body = json.dumps(jsonable_encoder(payload), sort_keys=True)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def expired(stored: models.IdempotencyKey):
+    return stored.created_at < datetime.utcnow() - timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS)
+
+
+def find(db: Session, key: str, user_id):
+    return db.get(models.IdempotencyKey, (user_id, key))
+
+
+def replay(stored: models.IdempotencyKey, request_hash: str):
+    """The stored response, provided the retry really is the same request."""
+    if stored.request_hash != request_hash:
+        raise HTTPException(422, "Idempotency-Key was already used for a different request")
+    return JSONResponse(
+        json.loads(stored.response),
+        status_code=stored.status_code,
+        headers={"Idempotent-Replayed": "true"}
+    )
+
+
+def lookup(db: Session, key: str, user_id, request_hash: str):
+    """
+    Replay response for a key seen before, else None.
+
+    A single primary-key read on (user_id, key). An expired entry is deleted
+    in the caller's transaction so the key can be stored again.
+    """
+    stored = find(db, key, user_id)
+    if stored is None:
+        return None
+    if expired(stored):
+        db.delete(stored)
+        db.flush()
+        return None
+    return replay(stored, request_hash)
+
+
+def remember(db: Session, key: str, user_id, request_hash: str, response, status_code: int = 200):
+    """Store the response in the caller's transaction; a racing duplicate fails its commit."""
+    db.add(models.IdempotencyKey(
+        key=key,
+        user_id=user_id,
+        request_hash=request_hash,
+        status_code=status_code,
+        response=json.dumps(jsonable_encoder(response)),
+        created_at=datetime.utcnow()
+    ))
+
+
+def purge_expired(db: Session):
+    cutoff = datetime.utcnow() - timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS)
+    result = db.execute(delete(models.IdempotencyKey).where(models.IdempotencyKey.created_at < cutoff))
+    db.commit()
+    return result.rowcount
+
+
+if __name__ == "__main__":
+    # python -m app.utils.idempotency  (run from cron to drop expired keys)
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        print(f"Purged {purge_expired(db)} expired idempotency keys")
+    finally:
+        db.close()
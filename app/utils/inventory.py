@@ -0,0 +1,125 @@
+from datetime import datetime
+from sqlalchemy import Select, func, select, update
+from sqlalchemy.orm import Session
+from app import models
+from app.utils.events import low_stock_events
+
+
+class OutOfStock(Exception):
+    def __init__(self, item_id: int):
+        super().__init__(f"Not enough stock for item {item_id}")
+        self.item_id = item_id
+
+
+def crossing(item_id: int, before: int, after: int, reorder_level: int):
+    """The low_stock / restocked event for a stock change, or None if it stayed on one side."""
+    if after <= reorder_level < before:
+        kind = "low_stock"
+    elif before <= reorder_level < after:
+        kind = "restocked"
+    else:
+        return None
+    return {"type": kind, "item_id": item_id, "stock": after, "reorder_level": reorder_level}
+
+
+def publish_crossings(events):
+    """Send crossings to low-stock subscribers; call only after the commit."""
+    for event in events:
+        low_stock_events.publish(event)
+
+
+def lock_stock(db: Session, item_ids):
+    """
+    {item_id: stock} for `item_ids` (ids, or a SELECT of them), the rows
+    locked until the transaction
+    ends: SELECT ... FOR UPDATE in item_id order, the order reserve_stock
+    takes them in, so lockers can't deadlock each other.
+
+    SQLite has no row locks, and pysqlite doesn't open a transaction for a
+    SELECT, so there a no-op UPDATE takes the database write lock first.
+    """
+    if not isinstance(item_ids, Select) and not item_ids:
+        return {}
+    if db.get_bind().dialect.name == "sqlite":
+        db.execute(
+            update(models.Inventory)
+            .where(models.Inventory.item_id.in_(item_ids))
+            .values(stock=models.Inventory.stock)
+            .execution_options(synchronize_session=False)
+        )
+    return dict(db.execute(
+        select(models.Inventory.item_id, models.Inventory.stock)
+        .where(models.Inventory.item_id.in_(item_ids))
+        .order_by(models.Inventory.item_id)
+        .with_for_update()
+    ).all())
+
+
+def reserve_stock(db: Session, quantities: dict):
+    """
+    Take stock for every item in `quantities` ({item_id: qty}).
+
+    Each row is decremented with a conditional UPDATE
+    (stock = stock - :q WHERE stock >= :q), so concurrent orders can never
+    oversell. Rows are touched in item_id order so two orders sharing items
+    always lock them in the same order and cannot deadlock.
+
+    Returns the low_stock events for items this pushed to or below their
+    reorder level (read back with RETURNING, no extra query).
+
+    Does not commit: the caller owns the transaction and must roll back
+    when OutOfStock is raised.
+    """
+    crossings = []
+    for item_id in sorted(quantities):
+        qty = quantities[item_id]
+        row = db.execute(
+            update(models.Inventory)
+            .where(
+                models.Inventory.item_id == item_id,
+                models.Inventory.stock >= qty
+            )
+            .values(
+                stock=models.Inventory.stock - qty,
+                updated_at=datetime.utcnow()
+            )
+            .returning(models.Inventory.stock, models.Inventory.reorder_level)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if row is None:
+            raise OutOfStock(item_id)
+        event = crossing(item_id, row.stock + qty, row.stock, row.reorder_level)
+        if event:
+            crossings.append(event)
+    return crossings
+
+
+def restore_order_stock(db: Session, order_id: int):
+    """
+    Give back the stock of every line of an order in two statements: the
+    order's inventory rows locked in item_id order (lock_stock), then one
+    UPDATE ... FROM the lines summed per item.
+
+    Locking first, in the same order as reserve_stock, means a cancel and a
+    new order sharing items can't deadlock, whatever order the planner
+    picks for the UPDATE.
+
+    Does not commit, and does not check whether the order was already
+    cancelled; the caller guards that in the same transaction.
+    """
+    lines = select(
+        models.OrderItem.item_id,
+        func.sum(models.OrderItem.qty).label("qty")
+    ).where(
+        models.OrderItem.order_id == order_id
+    ).group_by(models.OrderItem.item_id).subquery()
+
+    if not lock_stock(db, select(models.OrderItem.item_id).where(models.OrderItem.order_id == order_id)):
+        return
+
+    db.execute(
+        update(models.Inventory)
+        .where(models.Inventory.item_id == lines.c.item_id)
+        .values(stock=models.Inventory.stock + lines.c.qty, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
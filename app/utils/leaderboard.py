@@ -0,0 +1,118 @@
+import heapq
+import threading
+import time
+from datetime import date, timedelta
+from sqlalchemy import func, select
+from app import models
+from app.config import settings
+
+ItemSales = models.ItemDailySales
+
+# Days each window covers, counting back from today (None = all time).
+# "week" matches /reports/weekly-sales: today and the 7 days before it.
+WINDOWS = {"today": 0, "week": 7, "all": None}
+
+
+def window_start(window: str):
+    days = WINDOWS[window]
+    return None if days is None else date.today() - timedelta(days=days)
+
+
+def window_query(window: str):
+    """Per-item totals for a window, grouped by item id from item_daily_sales."""
+    query = select(
+        ItemSales.item_id,
+        models.Item.name,
+        func.sum(ItemSales.qty),
+        func.sum(ItemSales.revenue)
+    ).join(models.Item, models.Item.id == ItemSales.item_id).group_by(
+        ItemSales.item_id, models.Item.name
+    )
+    start = window_start(window)
+    if start is not None:
+        query = query.where(ItemSales.day >= start)
+    return query
+
+
+class Leaderboard:
+    """
+    Per-window item totals held in memory and ranked with a heap on read.
+
+    A window is loaded from item_daily_sales once, then orders this worker
+    takes are added in place. It is reloaded after `ttl` seconds (to pick up
+    other workers' orders), when the day rolls over, or after a cancellation.
+
+    Readers go through current() / version() / load() / top():
+
+        totals = top_items.current(window)
+        if totals is None:
+            version = top_items.version()
+            totals = top_items.load(window, <rows read from the DB>, version)
+        return top_items.top(totals, limit)
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._windows = {}  # window -> (loaded_at, start, {item_id: [name, qty, revenue]})
+        self._version = 0   # bumped by every record() and invalidate()
+        self._lock = threading.Lock()
+
+    def current(self, window: str):
+        """The window's live totals, or None if it has to be (re)loaded."""
+        with self._lock:
+            loaded = self._windows.get(window)
+            if (
+                loaded is None
+                or loaded[0] + self.ttl < time.monotonic()
+                or loaded[1] != window_start(window)
+            ):
+                return None
+            return loaded[2]
+
+    def version(self):
+        """Read before querying the rows for load()."""
+        return self._version
+
+    def load(self, window: str, rows, version: int):
+        """
+        Install totals read from the DB and return them.
+
+        If a record() or invalidate() landed since `version` was read, the
+        rows may or may not include that order: the totals are still served
+        for this read but installed as expired, so the next read reloads
+        instead of counting the order twice (or never).
+        """
+        totals = {item_id: [name, int(qty or 0), float(revenue or 0)] for item_id, name, qty, revenue in rows}
+        with self._lock:
+            loaded_at = time.monotonic() if self._version == version else float("-inf")
+            self._windows[window] = (loaded_at, window_start(window), totals)
+        return totals
+
+    def top(self, totals, limit: int):
+        with self._lock:
+            best = heapq.nlargest(limit, totals.items(), key=lambda entry: (entry[1][1], entry[1][2]))
+        return [
+            {"item_id": item_id, "item": name, "qty_sold": qty, "revenue": round(revenue, 2)}
+            for item_id, (name, qty, revenue) in best
+            if qty > 0
+        ]
+
+    def record(self, day: date, lines):
+        """Add committed lines, (item_id, name, qty, unit_price) tuples, sold on `day`."""
+        with self._lock:
+            self._version += 1
+            for window, (loaded_at, start, totals) in self._windows.items():
+                if start is not None and day < start:
+                    continue
+                for item_id, name, qty, unit_price in lines:
+                    entry = totals.setdefault(item_id, [name, 0, 0.0])
+                    entry[1] += qty
+                    entry[2] += qty * float(unit_price)
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+            self._windows.clear()
+
+
+top_items = Leaderboard(ttl=settings.TOP_ITEMS_TTL)
@@ -0,0 +1,228 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+
+import httpx
+
+# Uncached reads by default: cached endpoints would time the cache, not the
+# database layer being compared
+DEFAULT_PATHS = ["/orders/?limit=20"]
+# What the floor staff hit while everyone logs in at shift change
+STORM_PATHS = ["/items/", "/orders/?limit=20"]
+
+
+def percentile(values, pct: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def summary(latencies, errors: int, seconds: float):
+    """Requests/sec and latency percentiles (ms) of one load run."""
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / seconds, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1) if latencies else None,
+    }
+
+
+async def load(client: httpx.AsyncClient, paths, clients: int, seconds: float, headers=None):
+    """`clients` concurrent loops GETting `paths` round-robin for `seconds`."""
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+
+    async def worker(n: int):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                r = await client.get(paths[n % len(paths)], headers=headers)
+                failed = r.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+            n += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(clients)))
+    return summary(latencies, errors, time.perf_counter() - started)
+
+
+async def register_staff(client: httpx.AsyncClient):
+    """Register a throwaway staff user; returns (email, password)."""
+    email = f"loadtest-{uuid.uuid4().hex[:12]}@example.com"
+    password = uuid.uuid4().hex
+    r = await client.post("/auth/register", json={
+        "name": "loadtest", "email": email, "password": password, "role": "staff"
+    })
+    r.raise_for_status()
+    return email, password
+
+
+async def staff_headers(client: httpx.AsyncClient, credentials=None):
+    """Bearer header of a staff user, registered first if no credentials are given."""
+    email, password = credentials or await register_staff(client)
+    r = await client.post("/auth/login", data={"username": email, "password": password})
+    r.raise_for_status()
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+async def storm(client: httpx.AsyncClient, credentials, logins: int, stop: asyncio.Event):
+    """
+    `logins` concurrent loops logging in until `stop` is set, waiting out
+    Retry-After on a 429 like a real client; counts by status code.
+    """
+    email, password = credentials
+    codes = Counter()
+
+    async def worker():
+        while not stop.is_set():
+            try:
+                r = await client.post("/auth/login", data={"username": email, "password": password})
+                codes[str(r.status_code)] += 1
+                if r.status_code == 429:
+                    await asyncio.sleep(float(r.headers.get("Retry-After", 1)))
+            except httpx.HTTPError:
+                codes["error"] += 1
+
+    await asyncio.gather(*(worker() for _ in range(logins)))
+    return dict(codes)
+
+
+def async_client(base_url: str, clients: int):
+    return httpx.AsyncClient(
+        base_url=base_url,
+        timeout=60,
+        limits=httpx.Limits(max_connections=clients, max_keepalive_connections=clients),
+    )
+
+
+@contextmanager
+def server(port: int, **env):
+    """uvicorn serving app.main:app on `port` with `env` on top of ours."""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app",
+         "--port", str(port), "--log-level", "warning"],
+        env={**os.environ, **env},
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                httpx.get(base_url + "/", timeout=1)
+                break
+            except httpx.TransportError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"server on port {port} did not start")
+                time.sleep(0.2)
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait()
+
+
+async def bench_mode(base_url: str, levels, seconds: float, paths):
+    results = {}
+    async with async_client(base_url, max(levels)) as client:
+        headers = await staff_headers(client)
+        # Warm the pools before the first timed run
+        await load(client, paths, min(levels), 1, headers)
+        for clients in levels:
+            results[clients] = await load(client, paths, clients, seconds, headers)
+    return results
+
+
+def run_storm(base_url: str, credentials, logins: int, seconds: float, results):
+    """storm() for `seconds` on its own event loop; the codes go into `results`."""
+    async def timed():
+        stop = asyncio.Event()
+        async with async_client(base_url, logins) as client:
+            task = asyncio.create_task(storm(client, credentials, logins, stop))
+            await asyncio.sleep(seconds)
+            stop.set()
+            return await task
+    results.update(asyncio.run(timed()))
+
+
+async def bench_login_storm(base_url: str, clients: int, logins: int, seconds: float, paths):
+    """
+    Menu/order latency on its own, then again while `logins` clients hammer
+    /auth/login. With hashing on the bounded pool the two should stay close;
+    logins beyond the pool's queue get 429 instead of slowing everything.
+
+    The storm runs in another process so its client work doesn't show up as
+    latency in the measured requests.
+    """
+    async with async_client(base_url, clients) as client:
+        credentials = await register_staff(client)
+        headers = await staff_headers(client, credentials)
+        await load(client, paths, clients, 1, headers)
+        baseline = await load(client, paths, clients, seconds, headers)
+
+        with multiprocessing.Manager() as manager:
+            codes = manager.dict()
+            # A second of head start so the pool is saturated before measuring
+            stormer = multiprocessing.Process(
+                target=run_storm, args=(base_url, credentials, logins, seconds + 1, codes)
+            )
+            stormer.start()
+            await asyncio.sleep(1)
+            during = await load(client, paths, clients, seconds, headers)
+            await asyncio.to_thread(stormer.join)
+            codes = dict(codes)
+    return {"baseline": baseline, "login_storm": during, "logins": codes}
+
+
+def bench_modes(levels, seconds: float, paths, port: int = 8100):
+    """
+    Run the same load against the app with DB_ASYNC off and on, one uvicorn
+    each, at every concurrency in `levels`.
+    """
+    results = {}
+    for offset, mode in enumerate(["sync", "async"]):
+        with server(port + offset, DB_ASYNC=str(mode == "async").lower()) as base_url:
+            results[mode] = asyncio.run(bench_mode(base_url, levels, seconds, paths))
+    return results
+
+
+if __name__ == "__main__":
+    # python -m app.utils.loadtest modes [--clients 50,100,250,500] [--seconds 10] [--path ...]
+    # python -m app.utils.loadtest login-storm [--clients 20] [--logins 100] [--seconds 10] [--path ...]
+    parser = argparse.ArgumentParser(description="HTTP load benchmarks against a local server")
+    commands = parser.add_subparsers(dest="command", required=True)
+    modes_cmd = commands.add_parser("modes", help="sync vs async database layer")
+    modes_cmd.add_argument("--clients", default="50,100,250,500")
+    storm_cmd = commands.add_parser("login-storm", help="menu/order latency during a login burst")
+    storm_cmd.add_argument("--clients", type=int, default=20)
+    storm_cmd.add_argument("--logins", type=int, default=100)
+    for command in (modes_cmd, storm_cmd):
+        command.add_argument("--seconds", type=float, default=10)
+        command.add_argument("--path", action="append", dest="paths")
+        command.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    if args.command == "modes":
+        levels = [int(n) for n in args.clients.split(",")]
+        results = bench_modes(levels, args.seconds, args.paths or DEFAULT_PATHS, args.port)
+        for mode, runs in results.items():
+            for clients, run in runs.items():
+                print(json.dumps({"mode": mode, "clients": clients, **run}))
+    else:
+        with server(args.port) as base_url:
+            print(json.dumps(asyncio.run(bench_login_storm(
+                base_url, args.clients, args.logins, args.seconds, args.paths or STORM_PATHS
+            )), indent=2))
@@ -0,0 +1,174 @@
+import contextvars
+import threading
+import time
+from sqlalchemy import event
+
+# Latency buckets in seconds, and buckets for queries per request
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Cumulative Prometheus-style histogram, one series per label tuple."""
+
+    def __init__(self, name: str, help: str, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+        for label_values, series in items:
+            base = [f'{name}="{escape(value)}"' for name, value in zip(self.labels, label_values)]
+            for bound, count in zip(self.buckets + ("+Inf",), series[:-2] + [series[-1]]):
+                labels = ",".join(base + ['le="%s"' % bound])
+                lines.append(f"{self.name}_bucket{{{labels}}} {count}")
+            suffix = "{" + ",".join(base) + "}" if base else ""
+            lines.append(f"{self.name}_sum{suffix} {series[-2]}")
+            lines.append(f"{self.name}_count{suffix} {series[-1]}")
+        return lines
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "Request latency by route",
+    labels=("method", "route", "status"))
+request_db_queries = Histogram(
+    "http_request_db_queries", "Database statements executed per request",
+    labels=("method", "route"), buckets=QUERY_BUCKETS)
+request_db_seconds = Histogram(
+    "http_request_db_seconds", "Time spent in database statements per request",
+    labels=("method", "route"))
+pool_wait = Histogram(
+    "db_pool_wait_seconds", "Time spent waiting to check a connection out of the pool")
+
+in_flight = 0
+
+
+# ---------------------- PER-REQUEST DB ACCOUNTING --------------------------
+
+class RequestStats:
+    """DB work done on behalf of one request; shared with the threads it runs in."""
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.queries = 0
+        self.db_seconds = 0.0
+
+    @property
+    def route(self):
+        # path_format drops convertors, so /{order_id:int} and /{order_id} match
+        route = self.scope.get("route")
+        return getattr(route, "path_format", None) or "unmatched"
+
+
+current_request = contextvars.ContextVar("current_request", default=None)
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    stats = current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+
+
+def instrument_engine(engine):
+    """Count statements and DB time against the current request (sync Engine)."""
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+
+def timed_pool(pool_class):
+    """Subclass of `pool_class` that records how long each checkout waited."""
+    class TimedPool(pool_class):
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                return super()._do_get()
+            finally:
+                pool_wait.observe(time.perf_counter() - started)
+
+    TimedPool.__name__ = "Timed" + pool_class.__name__
+    return TimedPool
+
+
+# ---------------------- MIDDLEWARE --------------------------
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, in-flight count and DB usage per route.
+
+    Only installed when METRICS_ENABLED is on, so it costs nothing otherwise.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        global in_flight
+        in_flight += 1
+        stats = RequestStats(scope)
+        token = current_request.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_flight -= 1
+            current_request.reset(token)
+            method, route = scope["method"], stats.route
+            request_duration.observe(elapsed, method, route, str(status))
+            request_db_queries.observe(stats.queries, method, route)
+            request_db_seconds.observe(stats.db_seconds, method, route)
+
+
+def render(pools=()):
+    """All metrics in the Prometheus text exposition format."""
+    lines = [
+        "# HELP http_requests_in_flight Requests currently being served",
+        "# TYPE http_requests_in_flight gauge",
+        f"http_requests_in_flight {in_flight}",
+    ]
+    for histogram in (request_duration, request_db_queries, request_db_seconds, pool_wait):
+        lines.extend(histogram.render())
+    for key in ("checked_out", "idle", "overflow"):
+        lines.append(f"# TYPE db_pool_{key} gauge")
+        for name, status in pools:
+            if key in status:
+                lines.append(f'db_pool_{key}{{engine="{name}"}} {status[key]}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,72 @@
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+from app import models
+from app.utils import rollup
+from app.utils.inventory import restore_order_stock
+
+# Allowed moves: status -> statuses it may go to next
+TRANSITIONS = {
+    "created": {"preparing", "cancelled"},
+    "preparing": {"ready", "cancelled"},
+    "ready": {"completed", "cancelled"},
+    "completed": set(),
+    "cancelled": set(),
+}
+
+
+def allowed_from(new_status: str):
+    return [status for status, targets in TRANSITIONS.items() if new_status in targets]
+
+
+def log_status(db: Session, rows):
+    """Append status events; rows are dicts of order_id, status, changed_by, created_at."""
+    if rows:
+        db.execute(insert(models.OrderStatusEvent), rows)
+
+
+def change_status(db: Session, order_id: int, new_status: str, user_id=None):
+    """
+    Move an order to new_status if TRANSITIONS allows it from where it is now.
+
+    The check and the write are one conditional UPDATE
+    (... WHERE id = :id AND status IN (:allowed_from)), so two racing
+    requests can't both win. Cancelling also gives the stock back and
+    books the cancellation in the rollup, in the caller's transaction.
+
+    Returns False when the order already has new_status (nothing to do).
+    """
+    if new_status not in TRANSITIONS:
+        raise HTTPException(400, "Invalid status")
+
+    changed = db.execute(
+        update(models.Order)
+        .where(models.Order.id == order_id, models.Order.status.in_(allowed_from(new_status)))
+        .values(status=new_status)
+        .returning(models.Order.created_at, models.Order.total_amount)
+        .execution_options(synchronize_session=False)
+    ).first()
+
+    if changed is None:
+        # Only failures pay for the extra read that explains them
+        current = db.scalar(select(models.Order.status).where(models.Order.id == order_id))
+        if current is None:
+            raise HTTPException(404, "Order not found")
+        if current == new_status:
+            return False
+        raise HTTPException(409, f"Cannot move order from {current} to {new_status}")
+
+    log_status(db, [{
+        "order_id": order_id,
+        "status": new_status,
+        "changed_by": user_id,
+        "created_at": datetime.utcnow(),
+    }])
+
+    if new_status == "cancelled":
+        restore_order_stock(db, order_id)
+        rollup.record_cancellation(db, changed.created_at, changed.total_amount)
+        rollup.record_item_cancellation(db, order_id, changed.created_at)
+
+    return True
@@ -0,0 +1,130 @@
+import base64
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import exists, select, tuple_
+from app import models
+
+
+def full_order_query(order_id: int):
+    """One SELECT joining orders → order_items → items for FullOrderResponse."""
+    return select(
+        models.Order.id,
+        models.Order.status,
+        models.Order.total_amount,
+        models.Order.created_at,
+        models.OrderItem.item_id,
+        models.Item.name,
+        models.OrderItem.qty,
+        models.OrderItem.unit_price
+    ).outerjoin(
+        models.OrderItem, models.OrderItem.order_id == models.Order.id
+    ).outerjoin(
+        models.Item, models.Item.id == models.OrderItem.item_id
+    ).where(
+        models.Order.id == order_id
+    ).order_by(models.OrderItem.id)
+
+
+def full_order_response(rows):
+    """Fold the rows of full_order_query into a FullOrderResponse dict (None if no order)."""
+    if not rows:
+        return None
+
+    order = rows[0]
+    return {
+        "id": order.id,
+        "status": order.status,
+        "total_amount": order.total_amount,
+        "created_at": order.created_at,
+        "items": [
+            {
+                "item_id": r.item_id,
+                "name": r.name,
+                "qty": r.qty,
+                "unit_price": r.unit_price
+            }
+            for r in rows if r.item_id is not None
+        ]
+    }
+
+
+# ---------------------- ORDER LISTING --------------------------
+
+def encode_cursor(created_at: datetime, order_id: int):
+    raw = f"{created_at.isoformat()}|{order_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, order_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(order_id)
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+
+
+def order_list_query(
+    status: Optional[str] = None,
+    user_id: Optional[int] = None,
+    item_id: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    oldest_first: bool = False,
+    limit: int = 50,
+):
+    """
+    Keyset-paginated order summaries on (created_at, id).
+
+    Fetches limit + 1 rows so order_page can tell whether another page exists.
+    Deep pages cost the same as the first one: the cursor becomes a range
+    condition on the index instead of an OFFSET.
+    """
+    key = tuple_(models.Order.created_at, models.Order.id)
+    query = select(
+        models.Order.id,
+        models.Order.user_id,
+        models.Order.status,
+        models.Order.total_amount,
+        models.Order.created_at
+    )
+
+    if status:
+        query = query.where(models.Order.status == status)
+    if user_id is not None:
+        query = query.where(models.Order.user_id == user_id)
+    if item_id is not None:
+        query = query.where(exists().where(
+            models.OrderItem.order_id == models.Order.id,
+            models.OrderItem.item_id == item_id
+        ))
+    if start:
+        query = query.where(models.Order.created_at >= start)
+    if end:
+        query = query.where(models.Order.created_at < end)
+
+    if cursor:
+        after = decode_cursor(cursor)
+        query = query.where(key > after if oldest_first else key < after)
+
+    if oldest_first:
+        query = query.order_by(models.Order.created_at, models.Order.id)
+    else:
+        query = query.order_by(models.Order.created_at.desc(), models.Order.id.desc())
+
+    return query.limit(limit + 1)
+
+
+def order_page(rows, limit: int):
+    """Turn order_list_query rows into an OrderPage dict."""
+    rows = list(rows)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return {
+        "orders": [dict(r._mapping) for r in rows],
+        "next_cursor": next_cursor
+    }
@@ -0,0 +1,229 @@
+import contextvars
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime
+from sqlalchemy import event
+from app.config import settings
+
+MAX_STATEMENT_CHARS = 2000
+MAX_PROFILE_QUERIES = 200
+PROFILES_KEPT = 50
+
+
+def param_shape(parameters, executemany: bool = False):
+    """Bound parameters with each value replaced by its type name (never the value)."""
+    if executemany:
+        rows = list(parameters or [])
+        return {"rows": len(rows), "shape": param_shape(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return None
+
+
+class RequestProfile:
+    """DB statements run on behalf of one request, kept in full only when profiling."""
+
+    def __init__(self, scope, detailed: bool):
+        self.scope = scope
+        self.detailed = detailed
+        self.db_seconds = 0.0
+        self.query_count = 0
+        self.queries = []   # the first MAX_PROFILE_QUERIES, when detailed
+
+    @property
+    def route(self):
+        route = self.scope.get("route")
+        return getattr(route, "path_format", None) or "unmatched"
+
+
+current_profile = contextvars.ContextVar("current_profile", default=None)
+
+
+# ---------------------- SLOW QUERY LOG --------------------------
+
+class SlowQueryLog:
+    """Ring buffer of the last `size` statements that took longer than the threshold."""
+
+    def __init__(self, size: int):
+        self.entries = deque(maxlen=size)
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def add(self, entry):
+        with self._lock:
+            self.entries.append(entry)
+            self.total += 1
+
+    def recent(self, limit: int):
+        with self._lock:
+            return list(self.entries)[-limit:][::-1]
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+
+slow_queries = SlowQueryLog(settings.SLOW_QUERY_LOG_SIZE)
+
+
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+
+def explain(conn, statement, parameters):
+    """
+    The statement's plan on a raw cursor (so it isn't itself profiled).
+
+    On Postgres only a plain SELECT is run again with ANALYZE; anything that
+    could write gets a plain EXPLAIN. Either way it runs inside a SAVEPOINT
+    that is always rolled back, so neither its effects nor a failure leak
+    into the request's transaction.
+    """
+    verb = statement.lstrip()[:6].upper()
+    if not verb.startswith(EXPLAINABLE):
+        return None
+    dialect = conn.dialect.name
+    if dialect == "postgresql":
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) " if verb == "SELECT" else "EXPLAIN "
+    elif dialect == "sqlite":
+        # Never executes the statement and can't abort the transaction
+        prefix = "EXPLAIN QUERY PLAN "
+    else:
+        return None
+
+    cursor = conn.connection.dbapi_connection.cursor()
+    savepoint = dialect == "postgresql"
+    try:
+        if savepoint:
+            cursor.execute("SAVEPOINT profiler_explain")
+        try:
+            cursor.execute(prefix + statement, parameters)
+            return [" ".join(str(column) for column in row) for row in cursor.fetchall()]
+        except Exception as e:
+            return [f"EXPLAIN failed: {e}"]
+        finally:
+            if savepoint:
+                cursor.execute("ROLLBACK TO SAVEPOINT profiler_explain")
+                cursor.execute("RELEASE SAVEPOINT profiler_explain")
+    finally:
+        cursor.close()
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["profile_started"].pop()
+    profile = current_profile.get()
+
+    if profile is not None:
+        profile.db_seconds += elapsed
+        profile.query_count += 1
+        if profile.detailed and len(profile.queries) < MAX_PROFILE_QUERIES:
+            profile.queries.append({
+                "statement": statement[:MAX_STATEMENT_CHARS],
+                "params": param_shape(parameters, executemany),
+                "ms": round(elapsed * 1000, 3),
+            })
+
+    if settings.SLOW_QUERY_MS and elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        entry = {
+            "at": datetime.utcnow().isoformat(),
+            "ms": round(elapsed * 1000, 3),
+            "route": profile.route if profile is not None else None,
+            "statement": statement[:MAX_STATEMENT_CHARS],
+            "params": param_shape(parameters, executemany),
+        }
+        if settings.SLOW_QUERY_EXPLAIN and not executemany:
+            entry["plan"] = explain(conn, statement, parameters)
+        slow_queries.add(entry)
+
+
+def instrument_engine(engine):
+    """Time every statement for the slow-query log and X-Debug-Profile (sync Engine)."""
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+
+def enabled():
+    return bool(settings.SLOW_QUERY_MS or settings.DEBUG_PROFILE)
+
+
+# ---------------------- PER-REQUEST PROFILES --------------------------
+
+profiles = OrderedDict()
+profiles_lock = threading.Lock()
+
+
+def keep_profile(profile_id, record):
+    with profiles_lock:
+        profiles[profile_id] = record
+        while len(profiles) > PROFILES_KEPT:
+            profiles.popitem(last=False)
+
+
+def get_profile(profile_id):
+    with profiles_lock:
+        return profiles.get(profile_id)
+
+
+class ProfilerMiddleware:
+    """
+    Tags DB statements with the request that ran them (for the slow-query
+    log's route) and, for requests sent with `X-Debug-Profile: 1` when
+    DEBUG_PROFILE is on, splits the time to the response into DB and Python.
+
+    The split comes back as X-Profile-* headers; the full breakdown, with
+    every statement and its timing, is kept under X-Profile-Id for
+    GET /debug/profiles/{id}.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        detailed = settings.DEBUG_PROFILE and any(
+            name == b"x-debug-profile" and value not in (b"", b"0")
+            for name, value in scope["headers"]
+        )
+        profile = RequestProfile(scope, detailed)
+        token = current_profile.set(profile)
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            if detailed and message["type"] == "http.response.start":
+                total = time.perf_counter() - started
+                profile_id = uuid.uuid4().hex[:12]
+                record = {
+                    "id": profile_id,
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": profile.route,
+                    "status": message["status"],
+                    "total_ms": round(total * 1000, 3),
+                    "db_ms": round(profile.db_seconds * 1000, 3),
+                    "python_ms": round((total - profile.db_seconds) * 1000, 3),
+                    "query_count": profile.query_count,
+                    "queries": sorted(profile.queries, key=lambda q: q["ms"], reverse=True),
+                }
+                keep_profile(profile_id, record)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile_id.encode()),
+                    (b"x-profile-total-ms", str(record["total_ms"]).encode()),
+                    (b"x-profile-db-ms", str(record["db_ms"]).encode()),
+                    (b"x-profile-python-ms", str(record["python_ms"]).encode()),
+                    (b"x-profile-queries", str(record["query_count"]).encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_profile.reset(token)
@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import time
+from urllib.parse import urlencode
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from app.config import settings
+from app.database import SessionLocal
+from app.utils.cache import get_cache, make_entry, cached_response
+
+logger = logging.getLogger(__name__)
+
+
+def report_key(name: str, **params):
+    """Cache key for a report: endpoint name plus its parameters in a stable order."""
+    return name + "?" + urlencode(sorted(params.items()))
+
+
+def with_session(report, *args):
+    """Compute callable running report(db, *args) on its own session (it can outlive the request)."""
+    def compute():
+        db = SessionLocal()
+        try:
+            return jsonable_encoder(report(db, *args))
+        finally:
+            db.close()
+    return compute
+
+
+def with_async_session(report, *args):
+    """with_session for report coroutines taking an AsyncSession."""
+    async def compute():
+        from app.database import AsyncSessionLocal
+        async with AsyncSessionLocal() as db:
+            return jsonable_encoder(await report(db, *args))
+    return compute
+
+
+def log_failure(task: asyncio.Task, message: str):
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(message, exc_info=task.exception())
+
+
+class ReportCache:
+    """
+    Stale-while-revalidate cache for report payloads.
+
+    An entry is fresh for `ttl` seconds and may be served for `stale` more
+    while one background refresh replaces it. Concurrent misses/refreshes of
+    a key in this process share one computation (single-flight). Keys read
+    in the last REPORT_HOT_SECONDS are refreshed ahead of expiry by a
+    background task, started and stopped with the app (see app.main), so
+    polling dashboards rarely wait on a query.
+    """
+
+    def __init__(self, ttl: int, stale: int):
+        self.ttl = ttl
+        self.stale = stale
+        self.cache = get_cache("reports", ttl=ttl + stale)
+        self.inflight = {}   # key -> asyncio.Task computing it
+        self.hot = {}        # key -> (compute, last requested, monotonic)
+        self.refresher = None
+        self.refreshes = 0
+
+    def age(self, entry):
+        return max(time.time() - entry["computed_at"], 0)
+
+    async def _compute(self, key, compute):
+        generation = self.cache.generation()
+        try:
+            if asyncio.iscoroutinefunction(compute):
+                payload = await compute()
+            else:
+                payload = await run_in_threadpool(compute)
+            entry = dict(make_entry(payload), computed_at=time.time())
+            self.cache.set(key, entry, generation=generation)
+            self.refreshes += 1
+            return entry
+        finally:
+            self.inflight.pop(key, None)
+
+    def refresh(self, key, compute):
+        """The running computation of `key`, starting one if there is none."""
+        task = self.inflight.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.get_running_loop().create_task(self._compute(key, compute))
+            self.inflight[key] = task
+        return task
+
+    def refresh_in_background(self, key, compute):
+        """refresh() that nobody awaits: its failure is logged instead of lost."""
+        running = self.inflight.get(key)
+        task = self.refresh(key, compute)
+        if task is not running:
+            task.add_done_callback(
+                lambda task: log_failure(task, f"Background refresh of report {key} failed")
+            )
+
+    async def get(self, key, compute, fresh: bool = False):
+        self.hot[key] = (compute, time.monotonic())
+
+        entry = None if fresh else self.cache.get(key)
+        if entry is None:
+            return await asyncio.shield(self.refresh(key, compute))
+        if self.age(entry) >= self.ttl:
+            # Serve what we have; the next poll gets the refreshed result
+            self.refresh_in_background(key, compute)
+        return entry
+
+    async def respond(self, request: Request, key, compute, fresh: bool = False):
+        entry = await self.get(key, compute, fresh)
+        age = int(self.age(entry))
+        response = cached_response(request, entry)
+        response.headers["Age"] = str(age)
+        response.headers["Cache-Control"] = (
+            f"private, max-age={max(self.ttl - age, 0)}, stale-while-revalidate={self.stale}"
+        )
+        return response
+
+    # ---- background refresh of hot keys ----
+
+    def start(self):
+        """Start the refresher on the running loop; called from the app's lifespan."""
+        if self.refresher is None or self.refresher.done():
+            self.refresher = asyncio.get_running_loop().create_task(self.run_refresher())
+            self.refresher.add_done_callback(
+                lambda task: log_failure(task, "Report refresher stopped")
+            )
+
+    async def stop(self):
+        """Cancel the refresher and wait for it to finish; called on shutdown."""
+        if self.refresher is None:
+            return
+        self.refresher.cancel()
+        try:
+            await self.refresher
+        except asyncio.CancelledError:
+            pass
+        self.refresher = None
+
+    async def run_refresher(self):
+        while True:
+            await asyncio.sleep(settings.REPORT_REFRESH_INTERVAL)
+            now = time.monotonic()
+            for key, (compute, requested_at) in list(self.hot.items()):
+                if requested_at + settings.REPORT_HOT_SECONDS < now:
+                    del self.hot[key]
+                    continue
+                entry = self.cache.get(key)
+                # Refresh keys that would go stale before the next pass
+                if entry is None or self.age(entry) + settings.REPORT_REFRESH_INTERVAL >= self.ttl:
+                    self.refresh_in_background(key, compute)
+
+    def stats(self):
+        return {
+            **self.cache.stats(),
+            "hot_keys": len(self.hot),
+            "inflight": len(self.inflight),
+            "refreshes": self.refreshes,
+        }
+
+
+report_cache = ReportCache(ttl=settings.REPORT_CACHE_TTL, stale=settings.REPORT_CACHE_STALE)
@@ -0,0 +1,166 @@
+import argparse
+from datetime import datetime, date, timedelta
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+from app import models
+
+Rollup = models.DailySalesRollup
+COUNTERS = ["orders_count", "gross", "cancelled_count", "cancelled_amount"]
+
+ItemSales = models.ItemDailySales
+ITEM_COUNTERS = ["qty", "revenue"]
+
+
+def _upsert(db: Session, model, keys, counters, rows):
+    """Add each row's counters onto the row with the same keys, creating it if needed."""
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as upsert
+
+        stmt = upsert(model).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[getattr(model, key) for key in keys],
+            set_={name: getattr(model, name) + stmt.excluded[name] for name in counters}
+        )
+        db.execute(stmt)
+        return
+
+    for row in rows:
+        result = db.execute(
+            update(model).where(
+                *[getattr(model, key) == row[key] for key in keys]
+            ).values(
+                **{name: getattr(model, name) + row[name] for name in counters}
+            )
+        )
+        if result.rowcount == 0:
+            db.execute(insert(model).values(**row))
+
+
+def _bump(db: Session, day: date, **deltas):
+    """Add `deltas` to the rollup row for `day`, creating it if needed."""
+    values = {name: deltas.get(name, 0) for name in COUNTERS}
+    _upsert(db, Rollup, ["day"], COUNTERS, [dict(day=day, **values)])
+
+
+def record_order(db: Session, created_at: datetime, amount, count: int = 1):
+    _bump(db, created_at.date(), orders_count=count, gross=amount)
+
+
+def record_cancellation(db: Session, created_at: datetime, amount):
+    _bump(db, created_at.date(), cancelled_count=1, cancelled_amount=amount)
+
+
+def record_items(db: Session, created_at: datetime, lines):
+    """Add sold lines, (item_id, qty, unit_price) tuples, to item_daily_sales in one statement."""
+    totals = {}
+    for item_id, qty, unit_price in lines:
+        sold, revenue = totals.get(item_id, (0, 0))
+        totals[item_id] = (sold + qty, revenue + qty * unit_price)
+    if not totals:
+        return
+
+    day = created_at.date()
+    _upsert(db, ItemSales, ["item_id", "day"], ITEM_COUNTERS, [
+        {"item_id": item_id, "day": day, "qty": qty, "revenue": revenue}
+        for item_id, (qty, revenue) in sorted(totals.items())
+    ])
+
+
+def record_item_cancellation(db: Session, order_id: int, created_at: datetime):
+    """Take a cancelled order's lines back out of item_daily_sales."""
+    lines = select(
+        models.OrderItem.item_id,
+        func.sum(models.OrderItem.qty).label("qty"),
+        func.sum(models.OrderItem.qty * models.OrderItem.unit_price).label("revenue")
+    ).where(
+        models.OrderItem.order_id == order_id
+    ).group_by(models.OrderItem.item_id).subquery()
+
+    db.execute(
+        update(ItemSales)
+        .where(ItemSales.item_id == lines.c.item_id, ItemSales.day == created_at.date())
+        .values(qty=ItemSales.qty - lines.c.qty, revenue=ItemSales.revenue - lines.c.revenue)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def rebuild(db: Session, start: date = None, end: date = None):
+    """Recompute rollup and item sales rows from the orders table (inclusive date range, all days if omitted)."""
+    day = func.date(models.Order.created_at)
+    cancelled = models.Order.status == "cancelled"
+
+    source = select(
+        day,
+        func.count(models.Order.id),
+        func.coalesce(func.sum(models.Order.total_amount), 0),
+        func.sum(case((cancelled, 1), else_=0)),
+        func.coalesce(func.sum(case((cancelled, models.Order.total_amount), else_=0)), 0),
+    ).group_by(day)
+
+    clear = delete(Rollup)
+    if start:
+        source = source.where(models.Order.created_at >= start)
+        clear = clear.where(Rollup.day >= start)
+    if end:
+        source = source.where(models.Order.created_at < end + timedelta(days=1))
+        clear = clear.where(Rollup.day <= end)
+
+    db.execute(clear)
+    db.execute(insert(Rollup).from_select(["day"] + COUNTERS, source))
+
+    # Same range for the per-item table, live orders only
+    item_source = select(
+        models.OrderItem.item_id,
+        day,
+        func.sum(models.OrderItem.qty),
+        func.sum(models.OrderItem.qty * models.OrderItem.unit_price),
+    ).join(models.Order).where(~cancelled).group_by(models.OrderItem.item_id, day)
+
+    item_clear = delete(ItemSales)
+    if start:
+        item_source = item_source.where(models.Order.created_at >= start)
+        item_clear = item_clear.where(ItemSales.day >= start)
+    if end:
+        item_source = item_source.where(models.Order.created_at < end + timedelta(days=1))
+        item_clear = item_clear.where(ItemSales.day <= end)
+
+    db.execute(item_clear)
+    db.execute(insert(ItemSales).from_select(["item_id", "day"] + ITEM_COUNTERS, item_source))
+    db.commit()
+
+
+def net_sales_query(start: date, end: date):
+    """Sales and order count excluding cancellations, for start <= day <= end."""
+    return select(
+        func.sum(Rollup.gross - Rollup.cancelled_amount),
+        func.sum(Rollup.orders_count - Rollup.cancelled_count)
+    ).where(
+        Rollup.day >= start,
+        Rollup.day <= end
+    )
+
+
+def net_sales(db: Session, start: date, end: date):
+    total, count = db.execute(net_sales_query(start, end)).one()
+    return float(total or 0), int(count or 0)
+
+
+if __name__ == "__main__":
+    # python -m app.utils.rollup [--start YYYY-MM-DD] [--end YYYY-MM-DD]
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Backfill / rebuild daily_sales_rollup and item_daily_sales")
+    parser.add_argument("--start", type=date.fromisoformat)
+    parser.add_argument("--end", type=date.fromisoformat)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        rebuild(db, args.start, args.end)
+    finally:
+        db.close()
@@ -0,0 +1,70 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from app.database import SessionLocal
+
+NDJSON = "application/x-ndjson"
+STREAM_BATCH_SIZE = 1000
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def ndjson_line(row):
+    return json.dumps(dict(row._mapping), default=_json_default) + "\n"
+
+
+def ndjson_stream(query):
+    """
+    Stream a Core SELECT as newline-delimited JSON.
+
+    Rows come off a server-side cursor STREAM_BATCH_SIZE at a time, so memory
+    stays flat whatever the table size and the first line goes out before the
+    query has finished. The stream opens its own session because it outlives
+    the request's dependencies.
+    """
+    def lines():
+        db = SessionLocal()
+        try:
+            result = db.execute(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+            for row in result:
+                yield ndjson_line(row)
+        finally:
+            db.close()
+
+    return StreamingResponse(lines(), media_type=NDJSON)
+
+
+def async_ndjson_stream(query):
+    """ndjson_stream for DB_ASYNC mode, over an AsyncSession stream."""
+    from app.database import AsyncSessionLocal
+
+    async def lines():
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+            async for row in result:
+                yield ndjson_line(row)
+
+    return StreamingResponse(lines(), media_type=NDJSON)
+
+
+def after_id_query(query, id_column, after_id=None, limit=None):
+    """Order `query` by id, starting after `after_id` and capped at `limit` rows."""
+    if after_id is not None:
+        query = query.where(id_column > after_id)
+    query = query.order_by(id_column)
+    return query.limit(limit) if limit else query
+
+
+def set_next_cursor(response: Response, rows, limit):
+    """Advertise the next page's after_id in X-Next-Cursor when this page is full."""
+    if limit and len(rows) == limit:
+        response.headers["X-Next-Cursor"] = str(rows[-1].id)
+    return rows
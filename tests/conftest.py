@@ -0,0 +1,90 @@
+import os
+import tempfile
+
+# Settings are read when app is first imported: point it at a throwaway
+# SQLite database (and cheap password hashing) before that happens
+DB_DIR = tempfile.mkdtemp(prefix="rms-tests-")
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(DB_DIR, "test.db")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("JWT_ALGO", "HS256")
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["CACHE_BACKEND"] = "memory"
+os.environ["DB_ASYNC"] = "false"
+
+import pytest
+from fastapi.testclient import TestClient
+from app import models
+from app.database import Base, SessionLocal, engine
+from app.main import app
+from app.utils.cache import backend
+from app.utils.leaderboard import top_items
+
+
+@pytest.fixture(autouse=True)
+def clean_db():
+    """Every test starts from empty tables and empty caches."""
+    yield
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+    backend.clear()
+    top_items.invalidate()
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def register(client, email: str, role: str):
+    """Authorization headers for a new user with `role`."""
+    r = client.post("/auth/register", json={"name": role, "email": email, "role": role, "password": "pw"})
+    assert r.status_code == 200, r.text
+    r = client.post("/auth/login", data={"username": email, "password": "pw"})
+    assert r.status_code == 200, r.text
+    return {"Authorization": "Bearer " + r.json()["access_token"]}
+
+
+@pytest.fixture
+def manager(client):
+    return register(client, "manager@example.com", "manager")
+
+
+@pytest.fixture
+def staff(client):
+    return register(client, "staff@example.com", "staff")
+
+
+@pytest.fixture
+def customer(client):
+    return register(client, "customer@example.com", "customer")
+
+
+def add_item(db, name: str, stock: int, price: float = 2.5, category: str = "food"):
+    item = models.Item(name=name, description="", price=price, category=category, is_active=True)
+    db.add(item)
+    db.flush()
+    db.add(models.Inventory(item_id=item.id, stock=stock, unit="pcs"))
+    db.commit()
+    return item.id
+
+
+@pytest.fixture
+def items(db):
+    """Ids of three items with 20 in stock each."""
+    return [add_item(db, f"item {n}", 20, category="drinks" if n == 0 else "food") for n in range(3)]
+
+
+def stock_of(db, item_id: int):
+    db.expire_all()
+    return db.query(models.Inventory.stock).filter(models.Inventory.item_id == item_id).scalar()
@@ -0,0 +1,87 @@
+import threading
+import pytest
+from app import models
+from tests.conftest import register, stock_of
+
+
+def batch(*orders):
+    return {"orders": [
+        {"client_key": key, "user_id": 1, "items": [{"item_id": item_id, "qty": qty}]}
+        for key, item_id, qty in orders
+    ]}
+
+
+def test_client_keys_are_scoped_to_the_terminal(client, db, staff, items):
+    other_terminal = register(client, "till-2@example.com", "staff")
+
+    first = client.post("/orders/batch", json=batch(("1", items[0], 1)), headers=staff).json()
+    second = client.post("/orders/batch", json=batch(("1", items[1], 2)), headers=other_terminal).json()
+
+    assert first["results"][0]["status"] == "created"
+    assert second["results"][0]["status"] == "created"
+    assert first["results"][0]["order_id"] != second["results"][0]["order_id"]
+    assert stock_of(db, items[1]) == 18
+    assert db.query(models.Order).filter(models.Order.client_key == "1").count() == 2
+
+
+def test_bad_rows_are_reported_and_the_rest_go_in(client, db, staff, items):
+    body = batch(
+        ("a", items[0], 2),
+        ("b", items[1], 25),    # more than is in stock
+        ("a", items[2], 1),     # key repeated in the batch
+        ("c", 999, 1),          # no such item
+        ("d", items[1], 20),
+    )
+
+    r = client.post("/orders/batch", json=body, headers=staff).json()
+
+    assert r["counts"] == {"created": 2, "error": 3}
+    assert [result["status"] for result in r["results"]] == ["created", "error", "error", "error", "created"]
+    assert (stock_of(db, items[0]), stock_of(db, items[1]), stock_of(db, items[2])) == (18, 0, 20)
+    rollup = db.query(models.DailySalesRollup).one()
+    assert (rollup.orders_count, float(rollup.gross)) == (2, 55.0)
+
+
+def test_replaying_a_batch_creates_nothing_new(client, db, staff, items):
+    body = batch(("a", items[0], 2), ("b", items[1], 3))
+    first = client.post("/orders/batch", json=body, headers=staff).json()
+
+    replay = client.post("/orders/batch", json=body, headers=staff).json()
+
+    assert replay["counts"] == {"duplicate": 2}
+    assert [r["order_id"] for r in replay["results"]] == [r["order_id"] for r in first["results"]]
+    assert (stock_of(db, items[0]), stock_of(db, items[1])) == (18, 17)
+    assert db.query(models.Order).count() == 2
+    assert db.query(models.DailySalesRollup).one().orders_count == 2
+
+
+def test_batch_commits_once(client, db, staff, items, monkeypatch):
+    # A failure after the orders are inserted must leave nothing behind
+    def fail(*args):
+        raise RuntimeError("rollup unavailable")
+    monkeypatch.setattr("app.routers.orders.rollup.record_items", fail)
+
+    with pytest.raises(RuntimeError):
+        client.post("/orders/batch", json=batch(("a", items[0], 2), ("b", items[1], 3)), headers=staff)
+
+    assert db.query(models.Order).count() == 0
+    assert (stock_of(db, items[0]), stock_of(db, items[1])) == (20, 20)
+
+
+def test_concurrent_batches_never_oversell(client, db, staff, items):
+    bodies = [batch(*[(f"{n}-{k}", items[0], 1) for k in range(3)]) for n in range(10)]
+    counts = []
+
+    def send(body):
+        start.wait()
+        counts.append(client.post("/orders/batch", json=body, headers=staff).json()["counts"])
+
+    start = threading.Barrier(len(bodies))
+    threads = [threading.Thread(target=send, args=(body,)) for body in bodies]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(c.get("created", 0) for c in counts) == 20
+    assert stock_of(db, items[0]) == 0
@@ -0,0 +1,136 @@
+import pytest
+from app.utils import cache
+from app.utils.cache import Cache, RedisBackend, SQLiteBackend, TTLCache
+
+
+class Clock:
+    """Stands in for the time module inside app.utils.cache."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+
+class FakeRedis:
+    """The slice of redis.Redis that RedisBackend uses, expiring keys on `clock`."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.data = {}  # key -> (value, expires at or None)
+
+    def get(self, key):
+        value, expires = self.data.get(key, (None, None))
+        if expires is not None and expires <= self.clock.now:
+            del self.data[key]
+            return None
+        return value
+
+    def set(self, key, value, ex=None):
+        self.data[key] = (value.encode(), None if ex is None else self.clock.now + ex)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def incr(self, key):
+        value = int(self.get(key) or 0) + 1
+        self.data[key] = (str(value).encode(), None)
+        return value
+
+    def flushdb(self):
+        self.data.clear()
+
+    def dbsize(self):
+        return len(self.data)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def store(request, clock, tmp_path):
+    if request.param == "memory":
+        return TTLCache(maxsize=100, ttl=60)
+    if request.param == "sqlite":
+        return SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    return RedisBackend(client=FakeRedis(clock))
+
+
+def test_round_trip_and_delete(store):
+    store.set("k", {"a": [1, 2]}, 60)
+    assert store.get("k") == {"a": [1, 2]}
+    store.delete("k")
+    assert store.get("k") is None
+
+
+def test_entries_expire(store, clock):
+    store.set("k", "v", 10)
+    clock.now += 9
+    assert store.get("k") == "v"
+    clock.now += 2
+    assert store.get("k") is None
+
+
+def test_incr_counts_from_one(store):
+    assert [store.incr("n") for _ in range(3)] == [1, 2, 3]
+
+
+def test_clear_in_one_worker_invalidates_the_others(store):
+    # Two Cache objects on one shared backend stand for two worker processes
+    worker_a, worker_b = Cache("menu", 60, store), Cache("menu", 60, store)
+    worker_a.set("items", ["old"])
+    assert worker_b.get("items") == ["old"]
+
+    worker_b.clear()
+
+    assert worker_a.get("items") is None
+
+
+def test_write_started_before_a_clear_is_not_served(store):
+    menu = Cache("menu", 60, store)
+    generation = menu.generation()   # read, then load from the DB...
+    menu.clear()                     # ...while an update invalidates
+    menu.set("items", ["stale"], generation=generation)
+
+    assert menu.get("items") is None
+
+
+def test_memory_backend_evicts_least_recently_used():
+    store = TTLCache(maxsize=2, ttl=60)
+    store.set("a", 1)
+    store.set("b", 2)
+    store.get("a")
+    store.set("c", 3)
+    assert (store.get("a"), store.get("b"), store.get("c")) == (1, None, 3)
+
+
+def test_pinned_entries_survive_eviction_until_they_expire(clock):
+    store = TTLCache(maxsize=2, ttl=60)
+    revoked, other = Cache("revoked", 60, store, pinned=True), Cache("other", 60, store)
+    revoked.set("jti", True, ttl=30)
+    for n in range(50):
+        other.set(n, n)
+
+    assert revoked.get("jti") is True
+    clock.now += 31
+    assert revoked.get("jti") is None
+
+
+def test_sqlite_backend_purges_expired_rows(clock, tmp_path):
+    store = SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    store.PURGE_EVERY = 3
+    store.set("old", 1, 5)
+    clock.now += 10
+    store.set("new", 2, 60)
+    assert store.size() == 2
+    store.set("newer", 3, 60)   # third write purges
+    assert store.size() == 2
+    assert store.get("old") is None
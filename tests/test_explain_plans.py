@@ -0,0 +1,87 @@
+import random
+from datetime import date, datetime, timedelta
+import pytest
+from sqlalchemy import insert, text
+from app import models
+from app.routers.reports import low_stock_query
+from app.utils.leaderboard import window_query
+from app.utils.orders import full_order_query, order_list_query
+from app.utils.rollup import net_sales_query
+from tests.conftest import add_item
+
+# Tables a query may only reach through an index, never a full scan
+TABLES = {"orders", "order_items", "items", "inventory", "daily_sales_rollup", "item_daily_sales"}
+
+
+@pytest.fixture
+def seeded(db):
+    """A few hundred orders over two months, with planner statistics."""
+    random.seed(7)
+    item_ids = [add_item(db, f"item {n}", stock=random.randint(0, 50)) for n in range(40)]
+    start = datetime(2026, 8, 1)
+    order_ids = db.execute(
+        insert(models.Order).returning(models.Order.id, sort_by_parameter_order=True),
+        [
+            {
+                "user_id": random.randint(1, 30),
+                "status": random.choice(["created", "preparing", "completed", "cancelled"]),
+                "total_amount": 10,
+                "created_at": start + timedelta(minutes=97 * n),
+            }
+            for n in range(800)
+        ]
+    ).scalars().all()
+    db.execute(insert(models.OrderItem), [
+        {"order_id": order_id, "item_id": random.choice(item_ids), "qty": 1, "unit_price": 2.5}
+        for order_id in order_ids for _ in range(3)
+    ])
+    db.execute(insert(models.DailySalesRollup), [
+        {"day": date(2026, 8, 1) + timedelta(days=n), "orders_count": 10, "gross": 100,
+         "cancelled_count": 0, "cancelled_amount": 0}
+        for n in range(60)
+    ])
+    db.execute(insert(models.ItemDailySales), [
+        {"item_id": item_id, "day": date(2026, 8, 1) + timedelta(days=n), "qty": 3, "revenue": 7.5}
+        for item_id in item_ids for n in range(60)
+    ])
+    db.commit()
+    db.execute(text("ANALYZE"))
+    return {"order_id": order_ids[400], "item_id": item_ids[5]}
+
+
+def plan(db, query):
+    compiled = query.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    return [row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))]
+
+
+def full_scans(steps, allowed=()):
+    """SCAN steps over TABLES: reads of a whole table or a whole index, unless allowed."""
+    return [
+        step for step in steps
+        if step.startswith("SCAN ") and step.split()[1] in TABLES and step not in allowed
+    ]
+
+
+# The keyset walk newest/oldest first, stopped by the LIMIT
+KEYSET_WALK = "SCAN orders USING INDEX ix_orders_created_at_id"
+
+
+@pytest.mark.parametrize("name, make_query, allowed", [
+    ("get order", lambda ids: full_order_query(ids["order_id"]), ()),
+    ("list orders", lambda ids: order_list_query(), (KEYSET_WALK,)),
+    ("list orders oldest first", lambda ids: order_list_query(oldest_first=True), (KEYSET_WALK,)),
+    ("list orders by status", lambda ids: order_list_query(status="preparing"), ()),
+    ("list orders by user", lambda ids: order_list_query(user_id=3), ()),
+    # The walk again, with one order_items index probe per order
+    ("list orders by item", lambda ids: order_list_query(item_id=ids["item_id"]), (KEYSET_WALK,)),
+    ("list orders in a range", lambda ids: order_list_query(
+        start=datetime(2026, 8, 10), end=datetime(2026, 8, 11)), ()),
+    ("low stock", lambda ids: low_stock_query(None), ()),
+    ("net sales", lambda ids: net_sales_query(date(2026, 8, 3), date(2026, 8, 9)), ()),
+    # Every item is a candidate, so items drives the join with one
+    # primary-key probe into item_daily_sales each
+    ("top items this week", lambda ids: window_query("week"), ("SCAN items",)),
+])
+def test_router_queries_use_indexes(db, seeded, name, make_query, allowed):
+    steps = plan(db, make_query(seeded))
+    assert not full_scans(steps, allowed), f"{name} scans a whole table:\n" + "\n".join(steps)
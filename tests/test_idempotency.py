@@ -0,0 +1,55 @@
+from app import models
+from tests.conftest import register, stock_of
+from tests.test_oversell import race
+
+
+def order(item_id, qty=2):
+    return {"user_id": 1, "items": [{"item_id": item_id, "qty": qty}]}
+
+
+def keyed(headers, key):
+    return {**headers, "Idempotency-Key": key}
+
+
+def test_retry_replays_the_stored_response(client, db, customer, items):
+    first = client.post("/orders/", json=order(items[0]), headers=keyed(customer, "k1"))
+    retry = client.post("/orders/", json=order(items[0]), headers=keyed(customer, "k1"))
+
+    assert first.status_code == retry.status_code == 200
+    assert "Idempotent-Replayed" not in first.headers
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+    assert db.query(models.Order).count() == 1
+    assert stock_of(db, items[0]) == 18
+
+
+def test_key_reused_for_another_request_is_rejected(client, db, customer, items):
+    client.post("/orders/", json=order(items[0]), headers=keyed(customer, "k1"))
+
+    r = client.post("/orders/", json=order(items[0], qty=3), headers=keyed(customer, "k1"))
+
+    assert r.status_code == 422
+    assert db.query(models.Order).count() == 1
+    assert stock_of(db, items[0]) == 18
+
+
+def test_keys_are_scoped_per_user(client, db, customer, items):
+    other = register(client, "other@example.com", "customer")
+
+    first = client.post("/orders/", json=order(items[0]), headers=keyed(customer, "k1"))
+    second = client.post("/orders/", json=order(items[1]), headers=keyed(other, "k1"))
+
+    assert first.status_code == second.status_code == 200
+    assert "Idempotent-Replayed" not in second.headers
+    assert first.json()["id"] != second.json()["id"]
+    assert db.query(models.Order).count() == 2
+
+
+def test_concurrent_retries_create_one_order(client, db, customer, items):
+    # Losers either see the stored key or fail the commit on it, roll their
+    # stock back and replay the winner
+    codes = race(client, keyed(customer, "k1"), [order(items[0])] * 8)
+
+    assert codes == [200] * 8
+    assert db.query(models.Order).count() == 1
+    assert stock_of(db, items[0]) == 18
@@ -0,0 +1,42 @@
+from tests.conftest import stock_of
+
+
+def place(client, headers, lines):
+    body = {"user_id": 1, "items": [{"item_id": item_id, "qty": qty} for item_id, qty in lines]}
+    r = client.post("/orders/", json=body, headers=headers)
+    assert r.status_code == 200, r.text
+    return r.json()["id"]
+
+
+def move(client, headers, order_id, status):
+    return client.patch(f"/orders/{order_id}/status", params={"status": status}, headers=headers)
+
+
+def test_cancel_gives_the_stock_back(client, db, manager, items):
+    # The same item on two lines is given back once, summed
+    order_id = place(client, manager, [(items[0], 2), (items[1], 3), (items[0], 1)])
+    assert (stock_of(db, items[0]), stock_of(db, items[1])) == (17, 17)
+
+    assert move(client, manager, order_id, "cancelled").status_code == 200
+
+    assert (stock_of(db, items[0]), stock_of(db, items[1]), stock_of(db, items[2])) == (20, 20, 20)
+
+
+def test_second_cancel_restores_nothing(client, db, manager, items):
+    order_id = place(client, manager, [(items[0], 4)])
+
+    assert move(client, manager, order_id, "cancelled").status_code == 200
+    assert move(client, manager, order_id, "cancelled").status_code == 200
+
+    assert stock_of(db, items[0]) == 20
+
+
+def test_completed_order_cannot_be_cancelled(client, db, manager, items):
+    order_id = place(client, manager, [(items[0], 4)])
+    for status in ("preparing", "ready", "completed"):
+        assert move(client, manager, order_id, status).status_code == 200
+
+    r = move(client, manager, order_id, "cancelled")
+
+    assert r.status_code == 409
+    assert stock_of(db, items[0]) == 16
@@ -0,0 +1,68 @@
+import threading
+import time
+from app import models
+from tests.conftest import add_item, stock_of
+
+THREADS = 24
+
+
+def race(client, headers, bodies):
+    """
+    POST every body to /orders/ at once; returns the status codes.
+
+    Prints the throughput of the race (run pytest with -s to see it).
+    """
+    start = threading.Barrier(len(bodies))
+    codes = []
+
+    def place(body):
+        start.wait()
+        codes.append(client.post("/orders/", json=body, headers=headers).status_code)
+
+    threads = [threading.Thread(target=place, args=(body,)) for body in bodies]
+    for thread in threads:
+        thread.start()
+    began = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - began
+    print(f"\n{len(bodies)} orders in {elapsed:.3f}s: {len(bodies) / elapsed:.0f} orders/sec")
+    return codes
+
+
+def test_concurrent_orders_never_oversell(client, db, manager):
+    item_id = add_item(db, "last few", stock=10)
+    body = {"user_id": 1, "items": [{"item_id": item_id, "qty": 1}]}
+
+    codes = race(client, manager, [body] * THREADS)
+
+    assert codes.count(200) == 10
+    assert codes.count(400) == THREADS - 10
+    assert stock_of(db, item_id) == 0
+    db.expire_all()
+    assert db.query(models.OrderItem).filter(models.OrderItem.item_id == item_id).count() == 10
+
+
+def test_orders_sharing_items_in_any_order_stay_consistent(client, db, manager):
+    first, second = add_item(db, "a", stock=12), add_item(db, "b", stock=12)
+    # Half the orders list the items one way round, half the other way
+    bodies = [
+        {"user_id": 1, "items": [{"item_id": a, "qty": 1}, {"item_id": b, "qty": 1}]}
+        for a, b in [(first, second), (second, first)] * (THREADS // 2)
+    ]
+
+    codes = race(client, manager, bodies)
+
+    assert codes.count(200) == 12
+    assert set(codes) <= {200, 400}
+    assert stock_of(db, first) == stock_of(db, second) == 0
+
+
+def test_failed_order_leaves_stock_untouched(client, db, manager, items):
+    body = {"user_id": 1, "items": [{"item_id": items[0], "qty": 5}, {"item_id": items[1], "qty": 21}]}
+
+    r = client.post("/orders/", json=body, headers=manager)
+
+    assert r.status_code == 400
+    assert stock_of(db, items[0]) == 20
+    assert stock_of(db, items[1]) == 20
@@ -0,0 +1,106 @@
+import pytest
+from sqlalchemy import event
+from app.database import engine
+from tests.conftest import add_item
+
+
+@pytest.fixture
+def statements():
+    """SQL statements run on the app's engine while the test is in its `with` block."""
+    class Recorder(list):
+        def __enter__(self):
+            self.clear()
+            event.listen(engine, "before_cursor_execute", self.record)
+            return self
+
+        def __exit__(self, *exc):
+            event.remove(engine, "before_cursor_execute", self.record)
+
+        def record(self, conn, cursor, statement, parameters, context, executemany):
+            self.append(statement)
+
+    return Recorder()
+
+
+def place_order(client, headers, item_ids):
+    body = {"user_id": 1, "items": [{"item_id": item_id, "qty": 1} for item_id in item_ids]}
+    r = client.post("/orders/", json=body, headers=headers)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+@pytest.fixture
+def menu(db):
+    return [add_item(db, f"item {n}", stock=100) for n in range(20)]
+
+
+def test_get_order_is_one_query_whatever_its_size(client, manager, menu, statements):
+    order = place_order(client, manager, menu)
+
+    with statements:
+        r = client.get(f"/orders/{order['id']}")
+
+    assert r.status_code == 200
+    assert len(r.json()["items"]) == 20
+    assert len(statements) == 1, statements
+
+
+def test_create_order_cost_does_not_grow_with_lines(client, manager, menu, statements):
+    # Loads the caller into the user cache, so only the order itself is counted
+    place_order(client, manager, menu[:1])
+
+    with statements:
+        place_order(client, manager, menu[:1])
+    one_line = len(statements)
+
+    with statements:
+        order = place_order(client, manager, menu[1:3])
+    two_lines = len(statements)
+
+    with statements:
+        order = place_order(client, manager, menu[3:])
+    many_lines = len(statements)
+
+    assert len(order["items"]) == 17
+    # reserve_stock takes one conditional UPDATE per distinct item; nothing
+    # else may depend on the number of lines
+    per_item = two_lines - one_line
+    assert per_item == 1
+    assert many_lines == one_line + 16 * per_item, statements
+
+
+def test_list_orders_is_one_query(client, staff, manager, menu, statements):
+    for n in range(5):
+        place_order(client, manager, menu[n:n + 3])
+    client.get("/orders/", params={"limit": 3}, headers=staff)
+
+    with statements:
+        r = client.get("/orders/", params={"limit": 3}, headers=staff)
+
+    assert len(r.json()["orders"]) == 3
+    assert len(statements) == 1, statements
+
+
+def test_menu_is_served_from_cache(client, menu, statements):
+    client.get("/items/")
+
+    with statements:
+        r = client.get("/items/")
+
+    assert len(r.json()) == 20
+    assert statements == []
+
+
+def test_batch_does_not_reload_items_after_commit(client, staff, menu, statements):
+    batch = {"orders": [
+        {"client_key": f"till-{n}", "user_id": 1,
+         "items": [{"item_id": item_id, "qty": 1} for item_id in menu[n:n + 5]]}
+        for n in range(4)
+    ]}
+
+    with statements:
+        r = client.post("/orders/batch", json=batch, headers=staff)
+
+    assert r.json()["counts"] == {"created": 4}
+    item_reads = [s for s in statements if "FROM items" in s]
+    assert len(item_reads) == 1, item_reads
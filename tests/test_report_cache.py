@@ -0,0 +1,36 @@
+import asyncio
+import logging
+from fastapi.testclient import TestClient
+from app.main import app
+from app.utils.report_cache import ReportCache, report_cache
+
+
+def test_refresher_runs_for_the_life_of_the_app():
+    with TestClient(app):
+        refresher = report_cache.refresher
+        assert refresher is not None and not refresher.done()
+
+    assert refresher.cancelled()
+    assert report_cache.refresher is None
+
+
+def test_failed_background_refresh_is_logged(caplog):
+    reports = ReportCache(ttl=0, stale=60)
+
+    def broken():
+        raise RuntimeError("database went away")
+
+    async def scenario():
+        await reports.get("sales", lambda: {"total": 1})
+        # Stale: served as is while the refresh fails in the background
+        entry = await reports.get("sales", broken)
+        while reports.inflight:
+            await asyncio.sleep(0.01)
+        return entry
+
+    with caplog.at_level(logging.ERROR, logger="app.utils.report_cache"):
+        entry = asyncio.run(scenario())
+
+    assert entry["payload"] == {"total": 1}
+    assert "Background refresh of report sales failed" in caplog.text
+    assert "database went away" in caplog.text